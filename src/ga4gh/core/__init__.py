@@ -3,8 +3,15 @@
 from importlib.metadata import PackageNotFoundError, version
 
 import ga4gh.core.models as core_models
-from ga4gh.core.digests import sha512t24u
-from ga4gh.core.enderef import ga4gh_deref, ga4gh_enref
+from ga4gh.core.digests import Digest, sha512t24u
+from ga4gh.core.enderef import (
+    ga4gh_deref,
+    ga4gh_deref_async,
+    ga4gh_deref_many,
+    ga4gh_enref,
+    ga4gh_enref_async,
+    ga4gh_enref_many,
+)
 from ga4gh.core.identifiers import (
     CURIE_NAMESPACE,
     CURIE_SEP,
@@ -27,12 +34,17 @@ __all__ = [
     "GA4GH_DIGEST_REGEXP",
     "GA4GH_IR_REGEXP",
     "GA4GH_PREFIX_SEP",
+    "Digest",
     "PrevVrsVersion",
     "VrsObjectIdentifierIs",
     "core_models",
     "ga4gh_deref",
+    "ga4gh_deref_async",
+    "ga4gh_deref_many",
     "ga4gh_digest",
     "ga4gh_enref",
+    "ga4gh_enref_async",
+    "ga4gh_enref_many",
     "ga4gh_identify",
     "ga4gh_serialize",
     "is_curie_type",
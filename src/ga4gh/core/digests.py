@@ -8,6 +8,13 @@ https://journals.plos.org/plosone/article?id=10.1371/journal.pone.0239883
 import base64
 import hashlib
 
+from ga4gh.core.identifiers import (
+    CURIE_NAMESPACE,
+    CURIE_SEP,
+    GA4GH_DIGEST_REGEXP,
+    GA4GH_PREFIX_SEP,
+)
+
 
 def sha512t24u(blob: bytes) -> str:
     """Generate a base64url-encode, truncated SHA-512 digest for given
@@ -32,3 +39,108 @@ def sha512t24u(blob: bytes) -> str:
     digest = hashlib.sha512(blob).digest()
     tdigest_b64us = base64.urlsafe_b64encode(digest[:digest_size])
     return tdigest_b64us.decode("ascii")
+
+
+# Type prefix codes of `Digest`, by position: no prefix, refget sequences, then
+# the `ga4gh.prefix` of each identifiable model, which tests check are all
+# listed. Codes are stored with digests, so new prefixes must be appended.
+DIGEST_TYPE_PREFIXES = ("", "SQ", "SL", "VA", "CPB", "AJ", "TM", "DM", "CN", "CX")
+_PREFIX_CODES = {prefix: code for code, prefix in enumerate(DIGEST_TYPE_PREFIXES)}
+
+
+class Digest(bytes):
+    """Compact form of a GA4GH computed identifier: one byte of type prefix
+    code (see `DIGEST_TYPE_PREFIXES`) followed by the 24 bytes of the
+    sha512t24u digest
+
+    Digests compare and hash as bytes, so they can be used in sets and as
+    dict keys, and sort by type, then digest. `str()` returns the CURIE,
+    which is also how object stores key a Digest.
+
+    Examples:
+    >>> d = Digest.from_curie("ga4gh:VA.Hy2XU_-rp4IMh6I_1NXNecBo8Qx8n0oE")
+    >>> d.prefix, d.digest
+    ('VA', 'Hy2XU_-rp4IMh6I_1NXNecBo8Qx8n0oE')
+    >>> str(d)
+    'ga4gh:VA.Hy2XU_-rp4IMh6I_1NXNecBo8Qx8n0oE'
+    >>> Digest.from_blob("SQ", b"ACGT").digest == sha512t24u(b"ACGT")
+    True
+
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, prefix: str, raw: bytes) -> "Digest":
+        """Return the Digest of type `prefix` (e.g., "VA", or "" for none)
+        with the 24 digest bytes `raw`
+        """
+        try:
+            code = _PREFIX_CODES[prefix]
+        except KeyError:
+            msg = f"Unknown digest type prefix: {prefix!r}"
+            raise ValueError(msg) from None
+        if len(raw) != 24:
+            msg = f"Expected 24 digest bytes, got {len(raw)}"
+            raise ValueError(msg)
+        return super().__new__(cls, bytes((code,)) + raw)
+
+    @classmethod
+    def from_digest(cls, prefix: str, digest: str) -> "Digest":
+        """Return the Digest of type `prefix` for a base64url sha512t24u digest"""
+        if not GA4GH_DIGEST_REGEXP.match(digest):
+            msg = f"Invalid sha512t24u digest: {digest!r}"
+            raise ValueError(msg)
+        return cls(prefix, base64.urlsafe_b64decode(digest))
+
+    @classmethod
+    def from_curie(cls, curie: str) -> "Digest":
+        """Return the Digest for a GA4GH CURIE (e.g., "ga4gh:VA.<digest>"),
+        prefixed digest (e.g., a refget accession, "SQ.<digest>") or digest
+        """
+        ns, sep, ident = curie.rpartition(CURIE_SEP)
+        if sep and ns != CURIE_NAMESPACE:
+            msg = f"Not a GA4GH CURIE: {curie!r}"
+            raise ValueError(msg)
+        prefix, _, digest = ident.rpartition(GA4GH_PREFIX_SEP)
+        return cls.from_digest(prefix, digest)
+
+    @classmethod
+    def from_blob(cls, prefix: str, blob: bytes) -> "Digest":
+        """Return the Digest of type `prefix` of `blob`, as with sha512t24u"""
+        return cls(prefix, hashlib.sha512(blob).digest()[:24])
+
+    @property
+    def prefix(self) -> str:
+        """The type prefix, e.g. "VA", or "" if none"""
+        return DIGEST_TYPE_PREFIXES[self[0]]
+
+    @property
+    def raw(self) -> bytes:
+        """The 24 digest bytes"""
+        return bytes(self[1:])
+
+    @property
+    def digest(self) -> str:
+        """The base64url digest, as returned by sha512t24u"""
+        return base64.urlsafe_b64encode(self[1:]).decode("ascii")
+
+    @property
+    def curie(self) -> str:
+        """The CURIE, e.g. "ga4gh:VA.<digest>", or the digest if no prefix"""
+        if not self[0]:
+            return self.digest
+        return (
+            f"{CURIE_NAMESPACE}{CURIE_SEP}{self.prefix}{GA4GH_PREFIX_SEP}{self.digest}"
+        )
+
+    def __str__(self) -> str:
+        """Return the CURIE"""
+        return self.curie
+
+    def __repr__(self) -> str:
+        """Return an expression that evaluates to the Digest"""
+        return f"Digest.from_curie({self.curie!r})"
+
+    def __getnewargs__(self) -> tuple[str, bytes]:
+        """Return the arguments of __new__, for pickling and copying"""
+        return self.prefix, self.raw
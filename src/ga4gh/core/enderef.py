@@ -7,10 +7,16 @@ These functions require a "class referable attribute" map, which will
 typically be generated from the schema by
 build_class_referable_attribute_map() in .models.py.
 
+Both conversions walk the object tree iteratively (no Python recursion),
+so deeply nested objects such as DerivativeMolecules are handled without
+hitting the recursion limit.
+
 """
 
 import logging
+from collections.abc import Iterable, Iterator, Mapping
 
+from pydantic import RootModel
 from pydantic.main import BaseModel
 
 from .identifiers import ga4gh_identify, is_ga4gh_identifier
@@ -24,51 +30,47 @@ from .pydantic import (
 _logger = logging.getLogger(__name__)
 
 
+def _inlined_objects(v) -> Iterator[BaseModel]:  # noqa: ANN001
+    """Yield inlined (non-reference) objects held by a referable attribute value"""
+    for o in v if isinstance(v, list) else (v,):
+        if is_pydantic_instance(o) and not isinstance(o, RootModel):
+            yield o
+
+
 def ga4gh_enref(
     o,  # noqa: ANN001
     cra_map,  # noqa: ANN001
     object_store=None,  # noqa: ANN001
     return_id_obj_tuple: bool = False,
+    in_place: bool = False,
 ) -> tuple:
-    """Recursively convert "referable attributes" from inlined to
-    referenced form.  Returns a new object.
+    """Convert "referable attributes" from inlined to referenced form,
+    at any depth.  Returns a new object unless `in_place` is set.
+
+    Every object is identified once, before any of its attributes are
+    replaced by references, so that its digest covers the inlined form.
+    Digests computed for an object are cached on its nested objects, which
+    are therefore not re-serialized when they are identified in turn.
 
     :param o: VRS object
     :param cra_map: class referrable-attribute map; { o.type: [attr, attr, ...] }
     :param object_store: `collections.abc.MutableMapping` subclass that stores
         objects as they are referenced. If not given, referenced objects are not stored.
     :param return_id_obj_tuple: include ID with return value or not
-    :return: new, enref'd object, as well as object ID if param set
+    :param in_place: if True, modify and return `o` instead of a copy
+    :return: enref'd object, as well as object ID if param set
     :raise TypeError: if any object IDs are non-GA4GH CURIEs
     """
 
-    def _id_and_store(o) -> str | None:  # noqa: ANN001
-        _id = ga4gh_identify(o)
-        if _id and object_store is not None:
-            object_store[_id] = o
-        return _id
-
-    def _enref(o: BaseModel) -> str | None:
-        """depth-first recursive, in-place enref of object; returns id of object"""
-        ref_att_names = cra_map.get(o.type, [])
-        for ran in ref_att_names:
-            v = getattr(o, ran)
-            if isinstance(v, list):
-                setattr(o, ran, [_enref(o2) for o2 in v])
-            elif isinstance(v, str):
-                pass
-            elif is_curie_type(v):  # already a reference
-                if not is_ga4gh_identifier(v):
-                    msg = (
-                        "Identifiable attribute CURIE is contains an invalid identifier"
-                    )
-                    raise TypeError(msg)
-            elif v is not None:
-                _id = _id_and_store(v)
-                if _id:
-                    setattr(o, ran, _id)
-
-        return _id_and_store(o)
+    def _enref_value(v):  # noqa: ANN001, ANN202
+        if v is None or isinstance(v, str):
+            return v
+        if is_curie_type(v):  # already a reference
+            if not is_ga4gh_identifier(v):
+                msg = "Identifiable attribute CURIE is contains an invalid identifier"
+                raise TypeError(msg)
+            return v
+        return ids.get(id(v)) or v
 
     if not is_pydantic_instance(o):
         msg = "Called ga4gh_enref() with non-pydantic instance"
@@ -77,15 +79,99 @@ def ga4gh_enref(
         msg = "Called ga4gh_enref() with non-identifiable object"
         raise ValueError(msg)
 
-    # in-place replacement on object copy
-    o = pydantic_copy(o)
-    _id = _enref(o)
+    if not in_place:
+        o = pydantic_copy(o)
+
+    ids = {}  # id(object) -> GA4GH identifier, for objects in the tree
+    stack = [(o, False)]
+    while stack:
+        node, children_done = stack.pop()
+        ref_att_names = cra_map.get(node.type, ())
+        if not children_done:
+            # pre-order: identify while still inlined, then visit children
+            ids[id(node)] = ga4gh_identify(node)
+            stack.append((node, True))
+            for ran in ref_att_names:
+                stack.extend((o2, False) for o2 in _inlined_objects(getattr(node, ran)))
+            continue
+
+        # post-order: children are enref'd and stored; replace them with ids
+        for ran in ref_att_names:
+            v = getattr(node, ran)
+            if isinstance(v, list):
+                setattr(node, ran, [_enref_value(v2) for v2 in v])
+            elif v is not None:
+                setattr(node, ran, _enref_value(v))
+
+        _id = ids[id(node)]
+        if _id and object_store is not None:
+            object_store[_id] = node
+
+    _id = ids[id(o)]
     return (_id, o) if return_id_obj_tuple else o
 
 
-def ga4gh_deref(o, cra_map, object_store) -> BaseModel:  # noqa: ANN001
-    """Convert "referable attributes" in-place from referenced to inlined
-    form.
+def ga4gh_enref_many(
+    objects: Iterable,
+    cra_map,  # noqa: ANN001
+    object_store=None,  # noqa: ANN001
+    return_id_obj_tuple: bool = False,
+    in_place: bool = False,
+    batch_size: int = 1000,
+) -> Iterator:
+    """Enref each object in `objects`, yielding results in input order.
+
+    Referenced objects are collected per batch of `batch_size` input objects,
+    so that objects shared within a batch (e.g., a common SequenceLocation)
+    are written once, and then written to `object_store` together. Stores
+    that provide `set_many(mapping)` receive each batch in a single call;
+    other stores are written one item at a time.
+
+    A partially written batch is flushed when the iterator is exhausted or
+    closed.
+
+    See `ga4gh_enref` for the remaining parameters.
+    """
+    if batch_size < 1:
+        msg = "batch_size must be a positive integer"
+        raise ValueError(msg)
+
+    batch = {} if object_store is not None else None
+    try:
+        for i, o in enumerate(objects, start=1):
+            yield ga4gh_enref(
+                o,
+                cra_map,
+                object_store=batch,
+                return_id_obj_tuple=return_id_obj_tuple,
+                in_place=in_place,
+            )
+            if batch and i % batch_size == 0:
+                _store_many(object_store, batch)
+                batch = {}
+    finally:
+        if batch:
+            _store_many(object_store, batch)
+
+
+def _store_many(object_store, objects: dict) -> None:  # noqa: ANN001
+    """Write `objects` to `object_store`, in bulk if the store supports it"""
+    set_many = getattr(object_store, "set_many", None)
+    if set_many is not None:
+        set_many(objects)
+    else:
+        for _id, o in objects.items():
+            object_store[_id] = o
+
+
+def ga4gh_deref(
+    o,  # noqa: ANN001
+    cra_map,  # noqa: ANN001
+    object_store,  # noqa: ANN001
+    in_place: bool = False,
+) -> BaseModel:
+    """Convert "referable attributes" from referenced to inlined
+    form, at any depth.  Returns a new object unless `in_place` is set.
 
     `object_store` must be a mappable object and is required for
     dereferencing.
@@ -93,35 +179,211 @@ def ga4gh_deref(o, cra_map, object_store) -> BaseModel:  # noqa: ANN001
     Raises KeyError if any object cannot be dereferenced
 
     """
+    if not is_pydantic_instance(o):
+        msg = "Called ga4gh_deref() with non-pydantic instance"
+        raise ValueError(msg)
+    if not o.is_ga4gh_identifiable():
+        msg = "Called ga4gh_deref() with non-identifiable object"
+        raise ValueError(msg)
 
-    def _deref(o: BaseModel):  # noqa: ANN202
-        """depth-first recursive, in-place deref of object; returns id of object"""
-        if o.type not in cra_map:
-            _logger.warning("%s not in cra_map %s", o.type, cra_map)
-            return o
+    if not in_place:
+        o = pydantic_copy(o)
+    if o.type not in cra_map:
+        _logger.warning("%s not in cra_map %s", o.type, cra_map)
+        return o
 
-        ref_att_names = cra_map[o.type]
-        for ran in ref_att_names:
-            v = getattr(o, ran)
-            if isinstance(v, list):
-                setattr(o, ran, [_deref(object_store[str(curie)]) for curie in v])
-            elif is_ga4gh_identifier(v):
-                v = get_pydantic_root(v)
-                dereffed_identifier = object_store[str(v)]
-                setattr(o, ran, _deref(dereffed_identifier))
-            else:
-                pass  # some object; pass as-is
+    _deref_many([o], cra_map, object_store)
+    return o
 
-        return o
 
+def ga4gh_deref_many(
+    objects: Iterable,
+    cra_map,  # noqa: ANN001
+    object_store,  # noqa: ANN001
+    in_place: bool = False,
+) -> list[BaseModel]:
+    """Convert "referable attributes" of a batch of objects from referenced
+    to inlined form, at any depth.  Returns new objects, in input order,
+    unless `in_place` is set.
+
+    All CURIEs reachable from the batch are collected and fetched level by
+    level, so each referenced object is fetched and dereferenced once per
+    batch, however often it is referenced. Stores that provide
+    `get_many(keys)` (returning a dict of the keys found) are queried once
+    per level; other stores are queried one key at a time.
+
+    Objects referenced more than once within the batch are inlined as the
+    same instance. Objects held by `object_store` are not modified.
+
+    Raises KeyError if any object cannot be dereferenced
+
+    """
+    objects = list(objects)
+    for o in objects:
+        if not is_pydantic_instance(o):
+            msg = "Called ga4gh_deref_many() with non-pydantic instance"
+            raise ValueError(msg)
+        if not o.is_ga4gh_identifiable():
+            msg = "Called ga4gh_deref_many() with non-identifiable object"
+            raise ValueError(msg)
+
+    if not in_place:
+        objects = [pydantic_copy(o) for o in objects]
+    _deref_many(objects, cra_map, object_store)
+    return objects
+
+
+async def ga4gh_enref_async(
+    o,  # noqa: ANN001
+    cra_map,  # noqa: ANN001
+    object_store=None,  # noqa: ANN001
+    return_id_obj_tuple: bool = False,
+    in_place: bool = False,
+) -> tuple:
+    """As ga4gh_enref, for an asyncio object store
+
+    Referenced objects are collected while enref'ing and written with a
+    single `await object_store.aset_many(...)`.
+
+    :param object_store: object with an `aset_many(items)` coroutine method
+        (see `ga4gh.vrs.extras.object_store.AsyncObjectStore`)
+    """
+    referenced = {} if object_store is not None else None
+    result = ga4gh_enref(o, cra_map, referenced, return_id_obj_tuple, in_place)
+    if referenced:
+        await object_store.aset_many(referenced)
+    return result
+
+
+async def ga4gh_deref_async(
+    o,  # noqa: ANN001
+    cra_map,  # noqa: ANN001
+    object_store,  # noqa: ANN001
+    in_place: bool = False,
+) -> BaseModel:
+    """As ga4gh_deref, for an asyncio object store
+
+    Referenced objects are fetched with one `await object_store.aget_many(keys)`
+    per level of references.
+
+    Raises KeyError if any object cannot be dereferenced
+
+    """
     if not is_pydantic_instance(o):
-        msg = "Called ga4gh_deref() with non-pydantic instance"
+        msg = "Called ga4gh_deref_async() with non-pydantic instance"
         raise ValueError(msg)
     if not o.is_ga4gh_identifiable():
-        msg = "Called ga4gh_deref() with non-identifiable object"
+        msg = "Called ga4gh_deref_async() with non-identifiable object"
         raise ValueError(msg)
 
-    # in-place replacement on object copy
-    o = pydantic_copy(o)
-    _deref(o)
+    if not in_place:
+        o = pydantic_copy(o)
+    if o.type not in cra_map:
+        _logger.warning("%s not in cra_map %s", o.type, cra_map)
+        return o
+
+    await _deref_many_async([o], cra_map, object_store)
     return o
+
+
+def _ga4gh_ref(v) -> str | None:  # noqa: ANN001
+    """Return the GA4GH identifier `v` refers to, or None if `v` is not a reference"""
+    if is_curie_type(v) and is_ga4gh_identifier(v):
+        return str(get_pydantic_root(v))
+    return None
+
+
+def _ref_atts(node, cra_map: Mapping) -> Iterator[tuple[str, object]]:  # noqa: ANN001
+    for ran in cra_map.get(node.type, ()):
+        yield ran, getattr(node, ran)
+
+
+def _collect_refs(pending: list, cra_map: Mapping, resolved: Mapping) -> set[str]:
+    """Return the CURIEs referenced from `pending` (at any inlined depth)
+    that are not already in `resolved`
+    """
+    curies = set()
+    stack = list(pending)
+    while stack:
+        node = stack.pop()
+        for _, v in _ref_atts(node, cra_map):
+            for v2 in v if isinstance(v, list) else (v,):
+                curie = _ga4gh_ref(v2)
+                if curie is not None and curie not in resolved:
+                    curies.add(curie)
+            stack.extend(_inlined_objects(v))
+    return curies
+
+
+def _inline_refs(objects: list, cra_map: Mapping, resolved: dict) -> None:
+    """Replace the references in `objects` and in `resolved` with the objects
+    in `resolved`
+    """
+
+    def _deref_value(v):  # noqa: ANN001, ANN202
+        curie = _ga4gh_ref(v)
+        return v if curie is None else resolved[curie]
+
+    # Fetched objects that hold references are copied before inlining, so
+    # that objects held by the store (e.g., a dict) are not modified.
+    for curie, o in resolved.items():
+        if o.type in cra_map:
+            resolved[curie] = pydantic_copy(o)
+
+    # Inline the references of the inputs and of every fetched object. Fetched
+    # objects are visited once each, not once per place they are inlined.
+    stack = [*objects, *resolved.values()]
+    while stack:
+        node = stack.pop()
+        for ran, v in _ref_atts(node, cra_map):
+            if isinstance(v, list):
+                setattr(node, ran, [_deref_value(v2) for v2 in v])
+            elif v is not None:
+                setattr(node, ran, _deref_value(v))
+            stack.extend(_inlined_objects(v))
+
+
+def _deref_many(objects: list, cra_map: Mapping, object_store) -> None:  # noqa: ANN001
+    """In-place deref of `objects`, prefetching referenced objects from `object_store`"""
+    # Collect references level by level: from the inputs, then from the
+    # objects fetched for the previous level, until nothing new is reachable.
+    resolved = {}
+    pending = objects
+    while curies := _collect_refs(pending, cra_map, resolved):
+        fetched = _fetch_many(object_store, curies)
+        resolved.update(fetched)
+        pending = list(fetched.values())
+    _inline_refs(objects, cra_map, resolved)
+
+
+async def _deref_many_async(objects: list, cra_map: Mapping, object_store) -> None:  # noqa: ANN001
+    """As _deref_many, awaiting one `aget_many` per level of references"""
+    resolved = {}
+    pending = objects
+    while curies := _collect_refs(pending, cra_map, resolved):
+        fetched = await object_store.aget_many(curies)
+        _check_fetched(curies, fetched)
+        resolved.update(fetched)
+        pending = list(fetched.values())
+    _inline_refs(objects, cra_map, resolved)
+
+
+def _check_fetched(keys: set[str], found: Mapping) -> None:
+    """:raise KeyError: if any of `keys` is not in `found`"""
+    missing = keys - found.keys()
+    if missing:
+        raise KeyError(min(missing))
+
+
+def _fetch_many(object_store, keys: set[str]) -> dict:  # noqa: ANN001
+    """Fetch `keys` from `object_store`, in bulk if the store supports it
+
+    :raise KeyError: if any key is not found
+    """
+    get_many = getattr(object_store, "get_many", None)
+    if get_many is None:
+        return {key: object_store[key] for key in keys}
+
+    found = get_many(keys)
+    _check_fetched(keys, found)
+    return found
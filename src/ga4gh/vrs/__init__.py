@@ -3,7 +3,14 @@
 from importlib.metadata import PackageNotFoundError, version
 
 from ga4gh.vrs import models
-from ga4gh.vrs.enderef import vrs_deref, vrs_enref
+from ga4gh.vrs.enderef import (
+    vrs_deref,
+    vrs_deref_async,
+    vrs_deref_many,
+    vrs_enref,
+    vrs_enref_async,
+    vrs_enref_many,
+)
 from ga4gh.vrs.models import VrsType
 from ga4gh.vrs.normalize import normalize
 
@@ -23,5 +30,9 @@ __all__ = [
     "models",
     "normalize",
     "vrs_deref",
+    "vrs_deref_async",
+    "vrs_deref_many",
     "vrs_enref",
+    "vrs_enref_async",
+    "vrs_enref_many",
 ]
@@ -5,16 +5,32 @@ See https://vr-spec.readthedocs.io/en/1.1/impl-guide/required_data.html
 
 """
 
+import asyncio
+import contextlib
 import datetime
 import functools
+import gzip
+import json
 import logging
+import mmap
 import os
+import sqlite3
+import threading
+import time
 from abc import ABC, abstractmethod
-from collections.abc import Sequence
-from urllib.parse import urlparse
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple, TypeVar
+from urllib.parse import parse_qs, urlparse
 
 import requests
 from bioutils.accessions import coerce_namespace
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ga4gh.core import sha512t24u
 
 _logger = logging.getLogger(__name__)
 
@@ -23,6 +39,160 @@ class DataProxyValidationError(Exception):
     """Class for validation errors during data proxy methods"""
 
 
+class CacheInfo(NamedTuple):
+    """Statistics of a data proxy cache. Sizes are in entries, or in bytes
+    for sequence caches.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class _AliasRecord(NamedTuple):
+    """Sequence entry of an alias snapshot"""
+
+    refget_accession: str
+    length: int
+    aliases: tuple[str, ...]
+
+
+_MISSING = object()
+_T = TypeVar("_T")
+
+
+class _LRUCache:
+    """Thread-safe LRU cache bounded by the total size of its values, as
+    measured by `sizeof` (by default, 1 per value)
+    """
+
+    def __init__(
+        self, maxsize: int, sizeof: Callable[[object], int] | None = None
+    ) -> None:
+        self.maxsize = maxsize
+        self._sizeof = sizeof or (lambda _: 1)
+        self._data = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+        self.currsize = 0
+        self._reserved = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> object:
+        """Return the value of `key`, or _MISSING"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: object) -> None:
+        """Cache `value` as the most recently used, evicting the least
+        recently used values as needed. Values larger than the cache are not
+        cached.
+        """
+        size = self._sizeof(value)
+        if size > self.maxsize:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.currsize -= old[1]
+            self._data[key] = (value, size)
+            self.currsize += size
+            self._evict(0)
+
+    def _evict(self, size: int) -> None:
+        """Evict the least recently used values until `size` more fits"""
+        while self._data and self.currsize + self._reserved + size > self.maxsize:
+            _, (_, evicted_size) = self._data.popitem(last=False)
+            self.currsize -= evicted_size
+            self.evictions += 1
+
+    def reserve(self, size: int) -> None:
+        """Evict values to make room for `size`, and hold that room until
+        `release()`, e.g. for a value while it is loaded
+        """
+        with self._lock:
+            self._evict(size)
+            self._reserved += size
+
+    def release(self, size: int) -> None:
+        """Release room held by `reserve()`"""
+        with self._lock:
+            self._reserved -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.currsize = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.evictions, self.maxsize, self.currsize
+            )
+
+
+_PACK_ALPHABET = b"ACGTNRYSWKMBDHVU"
+_PACK_CODES = bytes.maketrans(_PACK_ALPHABET, bytes(range(16)))
+_PACK_HIGH = bytes.maketrans(bytes(range(16)), bytes(c << 4 for c in range(16)))
+_UNPACK_HIGH = bytes(_PACK_ALPHABET[b >> 4] for b in range(256))
+_UNPACK_LOW = bytes(_PACK_ALPHABET[b & 15] for b in range(256))
+
+
+class _PackedSequence:
+    """Nucleotide sequence (IUPAC codes, upper case) packed in 4 bits per
+    residue. Slicing returns str.
+    """
+
+    __slots__ = ("_data", "_len")
+
+    def __init__(self, seq: str) -> None:
+        codes = seq.encode("ascii").translate(_PACK_CODES)
+        if len(codes) % 2:
+            codes += b"\0"
+        high = int.from_bytes(codes[0::2].translate(_PACK_HIGH), "big")
+        low = int.from_bytes(codes[1::2], "big")
+        self._data = (high | low).to_bytes(len(codes) // 2, "big")
+        self._len = len(seq)
+
+    @staticmethod
+    def can_pack(seq: str) -> bool:
+        return seq.isascii() and not seq.encode("ascii").translate(None, _PACK_ALPHABET)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._data)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, key: slice) -> str:
+        start, stop, step = key.indices(self._len)
+        if step != 1:
+            msg = "Only contiguous sequence slices are supported"
+            raise ValueError(msg)
+        if stop <= start:
+            return ""
+        packed = self._data[start // 2 : (stop + 1) // 2]
+        residues = bytearray(2 * len(packed))
+        residues[0::2] = packed.translate(_UNPACK_HIGH)
+        residues[1::2] = packed.translate(_UNPACK_LOW)
+        offset = start % 2
+        return residues[offset : offset + stop - start].decode("ascii")
+
+
+def _contig_nbytes(contig: str | _PackedSequence) -> int:
+    return contig.nbytes if isinstance(contig, _PackedSequence) else len(contig)
+
+
 class _DataProxy(ABC):
     """abstract class / interface for VRS data needs
 
@@ -32,8 +202,168 @@ class _DataProxy(ABC):
     natively by the data source or synthesized by the proxy from the
     data source or synthesized.
 
+    Results are cached per instance (see `cache_info()`): metadata and
+    identifier translations up to `metadata_cache_size` entries each, and
+    sequences up to `sequence_cache_bytes` bytes in total. Subsequences
+    are fetched and cached in aligned blocks of `sequence_block_size`
+    residues, so that nearby lookups are served from the same blocks.
+
+    `SequenceProxy` instances of the proxy hold windows of their sequence
+    that grow by at least `sequence_window_growth` residues at a time, up to
+    `sequence_window_max` residues.
+
+    Identifier translations and sequence lengths are answered from memory
+    for the sequences of a loaded alias snapshot (see `save_alias_snapshot()`
+    and `load_alias_snapshot()`).
+
     """
 
+    metadata_cache_size = 1024
+    sequence_cache_bytes = 128 * 2**20
+    sequence_block_size = 64 * 2**10
+    sequence_window_growth = 128
+    sequence_window_max = 2**20
+
+    def __init__(
+        self,
+        *,
+        metadata_cache_size: int | None = None,
+        sequence_cache_bytes: int | None = None,
+        sequence_block_size: int | None = None,
+        sequence_window_growth: int | None = None,
+        sequence_window_max: int | None = None,
+        alias_snapshot: str | Path | None = None,
+    ) -> None:
+        """Initialize DataProxy instance.
+
+        :param metadata_cache_size: maximum number of cached metadata records,
+            and of cached identifier translations
+        :param sequence_cache_bytes: maximum total size of cached sequences
+        :param sequence_block_size: size of the blocks in which subsequences
+            are fetched and cached; 0 to cache each requested range instead
+        :param sequence_window_growth: minimum growth of `SequenceProxy`
+            windows; 0 to fetch each accessed range instead
+        :param sequence_window_max: maximum size of `SequenceProxy` windows;
+            larger ranges are fetched without being kept
+        :param alias_snapshot: path to an alias snapshot to load
+        """
+        if alias_snapshot is not None:
+            self.load_alias_snapshot(alias_snapshot)
+        if metadata_cache_size is not None:
+            self.metadata_cache_size = metadata_cache_size
+        if sequence_cache_bytes is not None:
+            self.sequence_cache_bytes = sequence_cache_bytes
+        if sequence_block_size is not None:
+            self.sequence_block_size = sequence_block_size
+        if sequence_window_growth is not None:
+            self.sequence_window_growth = sequence_window_growth
+        if sequence_window_max is not None:
+            self.sequence_window_max = sequence_window_max
+
+    @functools.cached_property
+    def _caches(self) -> dict[str, _LRUCache]:
+        return self._create_caches()
+
+    @functools.cached_property
+    def _alias_snapshot(self) -> dict[str, _AliasRecord]:
+        return {}
+
+    def _create_caches(self) -> dict[str, _LRUCache]:
+        """Return the caches of this instance, by name"""
+        return {
+            "metadata": _LRUCache(self.metadata_cache_size),
+            "translate_sequence_identifier": _LRUCache(self.metadata_cache_size),
+            "sequence": _LRUCache(self.sequence_cache_bytes, sizeof=len),
+        }
+
+    def _cached(
+        self, cache: str, key: Hashable, func: Callable[..., _T], *args: object
+    ) -> _T:
+        """Return the cached value of `key`, or cache and return `func(*args)`"""
+        value = self._caches[cache].get(key)
+        if value is _MISSING:
+            value = func(*args)
+            self._caches[cache].put(key, value)
+        return value
+
+    def cache_info(self) -> dict[str, CacheInfo]:
+        """Return the statistics of each cache, by name"""
+        return {name: cache.info() for name, cache in self._caches.items()}
+
+    def clear_caches(self) -> None:
+        """Empty all caches. Statistics are kept."""
+        for cache in self._caches.values():
+            cache.clear()
+
+    def save_alias_snapshot(self, path: str | Path, identifiers: Iterable[str]) -> None:
+        """Write an alias snapshot of the sequences `identifiers`, for any
+        proxy to load with `load_alias_snapshot()`
+
+        The snapshot has a line for each sequence, of its refget accession,
+        its length and its other aliases, separated by tabs. It is compressed
+        if `path` ends with ".gz".
+
+        :param path: path to the snapshot file
+        :param identifiers: identifiers of the sequences to include
+        :raise KeyError: if any identifier is not found
+        """
+        path = Path(path)
+        opener = gzip.open if path.suffix == ".gz" else open
+        seen = set()
+        with opener(path, "wt") as f:
+            f.write("# vrs-python alias snapshot\n")
+            for identifier in identifiers:
+                md = self.get_metadata(identifier)
+                ga4gh_aliases = sorted(
+                    a for a in md["aliases"] if a.startswith("ga4gh:SQ.")
+                )
+                if not ga4gh_aliases:
+                    raise KeyError(identifier)
+                ga4gh_alias = ga4gh_aliases[0]
+                if ga4gh_alias in seen:
+                    continue
+                seen.add(ga4gh_alias)
+                aliases = sorted(set(md["aliases"]) - {ga4gh_alias})
+                fields = [ga4gh_alias.removeprefix("ga4gh:"), str(md["length"])]
+                f.write("\t".join(fields + aliases) + "\n")
+
+    def load_alias_snapshot(self, path: str | Path) -> None:
+        """Load an alias snapshot written by `save_alias_snapshot()`
+
+        :param path: path to the snapshot file
+        """
+        path = Path(path)
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt") as f:
+            for line in f:
+                if not line.strip() or line.startswith("#"):
+                    continue
+                refget_accession, length, *aliases = line.rstrip("\n").split("\t")
+                ga4gh_alias = f"ga4gh:{refget_accession}"
+                record = _AliasRecord(
+                    refget_accession, int(length), (ga4gh_alias, *aliases)
+                )
+                for alias in record.aliases:
+                    self._alias_snapshot[alias] = record
+
+    def _find_alias_record(self, identifier: str) -> _AliasRecord | None:
+        """Return the alias snapshot entry of `identifier`, if any"""
+        record = self._alias_snapshot.get(identifier)
+        if record is None and self._alias_snapshot and ":" not in identifier[1:]:
+            with contextlib.suppress(ValueError):
+                record = self._alias_snapshot.get(coerce_namespace(identifier))
+        return record
+
+    def get_sequence_length(self, identifier: str) -> int:
+        """Return the length of the sequence `identifier`
+
+        If the given sequence does not exist, KeyError is raised.
+        """
+        record = self._find_alias_record(identifier)
+        if record is not None:
+            return record.length
+        return self.get_metadata(identifier)["length"]
+
     @abstractmethod
     def get_sequence(
         self, identifier: str, start: int | None = None, end: int | None = None
@@ -100,7 +430,6 @@ class _DataProxy(ABC):
                 return seq_type
         return None
 
-    @functools.lru_cache
     def translate_sequence_identifier(
         self, identifier: str, namespace: str | None = None
     ) -> list[str]:
@@ -114,6 +443,22 @@ class _DataProxy(ABC):
         identifier isn't found.
 
         """
+        record = self._find_alias_record(identifier)
+        if record is not None:
+            if namespace is None:
+                return list(record.aliases)
+            return [a for a in record.aliases if a.startswith(namespace + ":")]
+        return self._cached(
+            "translate_sequence_identifier",
+            (identifier, namespace),
+            self._translate_sequence_identifier,
+            identifier,
+            namespace,
+        )
+
+    def _translate_sequence_identifier(
+        self, identifier: str, namespace: str | None
+    ) -> list[str]:
         try:
             md = self.get_metadata(identifier)
         except (ValueError, KeyError, IndexError) as e:
@@ -173,7 +518,52 @@ class _DataProxy(ABC):
             the actual reference sequence and ``require_validation`` is ``True``.
         """
         correct_ref = self.get_sequence(sequence_id, start_pos, end_pos)
+        self._check_ref(
+            sequence_id, start_pos, end_pos, ref, correct_ref, require_validation
+        )
+
+    def validate_ref_seqs(
+        self,
+        refs: Iterable[tuple[str, int, int, str]],
+        require_validation: bool = True,
+    ) -> list[bool]:
+        """Determine whether or not each of the expected reference sequences
+        matches the actual reference sequence, as for `validate_ref_seq()`.
+        The actual reference sequences are fetched with `get_sequences()`.
+
+        :param refs: sequence ID, start pos, end pos and expected reference
+            sequence of each reference to validate
+        :param require_validation: If ``True`` and if validation checks fail, a
+            ``DataProxyValidationError`` will be raised for the first invalid
+            reference. Error messages will always be logged.
+        :return: whether each reference is valid
+        :raises DataProxyValidationError: If any expected reference sequence does
+            not match the actual reference sequence and ``require_validation`` is
+            ``True``.
+        """
+        refs = list(refs)
+        correct_refs = self.get_sequences((r[0], r[1], r[2]) for r in refs)
+        valid = []
+        error = None
+        for ref, correct_ref in zip(refs, correct_refs, strict=True):
+            try:
+                self._check_ref(*ref, correct_ref, require_validation)
+            except DataProxyValidationError as e:
+                error = error or e
+            valid.append(ref[3] == correct_ref)
+        if error is not None:
+            raise error
+        return valid
 
+    @staticmethod
+    def _check_ref(
+        sequence_id: str,
+        start_pos: int,
+        end_pos: int,
+        ref: str,
+        correct_ref: str,
+        require_validation: bool,
+    ) -> None:
         if correct_ref != ref:
             err_msg = f"Reference mismatch at {sequence_id} position {start_pos}-{end_pos} (input gave '{ref}' but correct ref is '{correct_ref}')"
             _logger.warning(err_msg)
@@ -181,22 +571,149 @@ class _DataProxy(ABC):
             if require_validation:
                 raise DataProxyValidationError(err_msg)
 
+    def get_sequences(
+        self, regions: Iterable[tuple[str, int | None, int | None]]
+    ) -> list[str]:
+        """Return the subsequences for `(identifier, start, end)` regions, as
+        for `get_sequence()`
+
+        Proxies may fetch the regions together, e.g. concurrently or in merged
+        ranges.
+
+        :param regions: identifiers and interbase coordinates of subsequences
+        :return: subsequences, in the order of `regions`
+        :raise KeyError: if any identifier is not found
+        """
+        return [self.get_sequence(*region) for region in regions]
+
 
-class _SeqRepoDataProxyBase(_DataProxy):
-    # wraps seqreqpo classes in order to provide translation to/from
-    # `ga4gh` identifiers.
+class _SequenceDataProxyBase(_DataProxy):
+    # base of data proxies that fetch sequences and their metadata from a
+    # sequence source (SeqRepo, or a FASTA file), with translation to/from
+    # `ga4gh` identifiers, and optionally preloaded contigs.
+
+    preload_contigs = False
+    contig_memory_budget = 2**30
+    pack_contigs = False
+
+    def __init__(
+        self,
+        *,
+        preload_contigs: bool | None = None,
+        contig_memory_budget: int | None = None,
+        pack_contigs: bool | None = None,
+        **kwargs,
+    ) -> None:
+        """Initialize DataProxy instance.
+
+        :param preload_contigs: if True, load each sequence in full the first
+            time it is accessed, and serve all subsequences from memory. The
+            least recently used sequences are released to stay within
+            `contig_memory_budget` bytes, so sequences accessed in order (e.g.,
+            for chromosome-sorted input) are held one or two at a time.
+            Room for a sequence is made before it is loaded, so the budget
+            also bounds the sequence being loaded (and, when packing, its
+            unpacked form). Sequences larger than that are fetched as usual.
+        :param contig_memory_budget: memory budget for preloaded sequences
+        :param pack_contigs: if True, hold nucleotide sequences in 4 bits per
+            residue, halving their memory use at some cost to slicing speed
+        :param kwargs: cache options, as for `_DataProxy`
+        """
+        super().__init__(**kwargs)
+        if preload_contigs is not None:
+            self.preload_contigs = preload_contigs
+        if contig_memory_budget is not None:
+            self.contig_memory_budget = contig_memory_budget
+        if pack_contigs is not None:
+            self.pack_contigs = pack_contigs
+
+    def _create_caches(self) -> dict[str, _LRUCache]:
+        caches = super()._create_caches()
+        caches["contig"] = _LRUCache(self.contig_memory_budget, sizeof=_contig_nbytes)
+        return caches
+
+    def _get_contig(self, identifier: str) -> str | _PackedSequence | None:
+        """Return the preloaded sequence `identifier`, loading it if needed,
+        or None if it exceeds the memory budget
+        """
+        cache = self._caches["contig"]
+        contig = cache.get(identifier)
+        if contig is _MISSING:
+            # the fetched sequence, and its packed form while it is packed
+            length = self.get_sequence_length(identifier)
+            nbytes = length + (length + 1) // 2 if self.pack_contigs else length
+            if nbytes > self.contig_memory_budget:
+                return None
+            cache.reserve(nbytes)
+            try:
+                contig = self._get_sequence(identifier)
+                if self.pack_contigs and _PackedSequence.can_pack(contig):
+                    contig = _PackedSequence(contig)
+            finally:
+                cache.release(nbytes)
+            cache.put(identifier, contig)
+        return contig
 
-    @functools.lru_cache
     def get_metadata(self, identifier: str) -> dict:
+        return self._cached("metadata", identifier, self._get_metadata_list, identifier)
+
+    def _get_metadata_list(self, identifier: str) -> dict:
         md = self._get_metadata(identifier)
         md["aliases"] = list(a for a in md["aliases"])  # noqa: C400
         return md
 
-    @functools.lru_cache
     def get_sequence(
         self, identifier: str, start: int | None = None, end: int | None = None
     ) -> str:
-        return self._get_sequence(identifier, start=start, end=end)
+        if self.preload_contigs:
+            contig = self._get_contig(identifier)
+            if contig is not None:
+                return contig[start:end]
+        block_size = self.sequence_block_size
+        if not block_size or start is None or end is None or start < 0 or end <= start:
+            return self._cached(
+                "sequence",
+                (identifier, start, end),
+                self._get_sequence,
+                identifier,
+                start,
+                end,
+            )
+        first = start // block_size
+        blocks = self._get_blocks(identifier, first, (end - 1) // block_size)
+        offset = start - first * block_size
+        return "".join(blocks)[offset : offset + end - start]
+
+    def _get_blocks(self, identifier: str, first: int, last: int) -> list[str]:
+        """Return the sequence blocks `first` to `last` (inclusive) of
+        `identifier`, fetching each run of uncached blocks with one request.
+        Blocks past the end of the sequence are short or empty, and are not
+        requested past it.
+        """
+        block_size = self.sequence_block_size
+        cache = self._caches["sequence"]
+        blocks = [cache.get((identifier, i)) for i in range(first, last + 1)]
+        i = 0
+        while i < len(blocks):
+            if blocks[i] is not _MISSING:
+                i += 1
+                continue
+            j = i + 1
+            while j < len(blocks) and blocks[j] is _MISSING:
+                j += 1
+            block_start, block_end = (first + i) * block_size, (first + j) * block_size
+            if j == len(blocks):
+                block_end = min(block_end, self.get_sequence_length(identifier))
+            seq = (
+                self._get_sequence(identifier, block_start, block_end)
+                if block_start < block_end
+                else ""
+            )
+            for k in range(i, j):
+                blocks[k] = seq[(k - i) * block_size : (k - i + 1) * block_size]
+                cache.put((identifier, first + k), blocks[k])
+            i = j
+        return blocks
 
     @abstractmethod
     def _get_metadata(self, identifier: str) -> dict:  # pragma: no cover
@@ -209,15 +726,24 @@ class _SeqRepoDataProxyBase(_DataProxy):
         pass
 
 
-class SeqRepoDataProxy(_SeqRepoDataProxyBase):
+# former name, for subclasses outside this module
+_SeqRepoDataProxyBase = _SequenceDataProxyBase
+
+
+class SeqRepoDataProxy(_SequenceDataProxyBase):
     """DataProxy based on a local instance of SeqRepo"""
 
-    def __init__(self, sr) -> None:  # noqa: ANN001
+    # in get_sequences, regions of a sequence that are less than this many
+    # residues apart are read together
+    sequence_merge_gap = 1024
+
+    def __init__(self, sr, **kwargs) -> None:  # noqa: ANN001
         """Initialize DataProxy instance.
 
         :param sr: SeqRepo instance
+        :param kwargs: cache options, as for `_SequenceDataProxyBase`
         """
-        super().__init__()
+        super().__init__(**kwargs)
         self.sr = sr
 
     def _get_sequence(
@@ -226,6 +752,48 @@ class SeqRepoDataProxy(_SeqRepoDataProxyBase):
         # fetch raises KeyError if not found
         return self.sr.fetch_uri(coerce_namespace(identifier), start, end)
 
+    def get_sequences(
+        self, regions: Iterable[tuple[str, int | None, int | None]]
+    ) -> list[str]:
+        """Return the subsequences for `(identifier, start, end)` regions
+
+        The regions are sorted by sequence and position, and the regions of a
+        sequence that overlap or are less than `sequence_merge_gap` residues
+        apart are read with one fetch, so that each sequence is read once, in
+        order.
+
+        :param regions: identifiers and interbase coordinates of subsequences
+        :return: subsequences, in the order of `regions`
+        :raise KeyError: if any identifier is not found
+        """
+        regions = list(regions)
+        results = [""] * len(regions)
+        ranged = []
+        for i, (identifier, start, end) in enumerate(regions):
+            if start is None or end is None or start < 0 or end <= start:
+                results[i] = self.get_sequence(identifier, start, end)
+            else:
+                ranged.append(i)
+        ranged.sort(key=lambda i: regions[i])
+        while ranged:
+            identifier, span_start, span_end = regions[ranged[0]]
+            n = 1
+            while n < len(ranged):
+                next_identifier, next_start, next_end = regions[ranged[n]]
+                if (
+                    next_identifier != identifier
+                    or next_start - span_end >= self.sequence_merge_gap
+                ):
+                    break
+                span_end = max(span_end, next_end)
+                n += 1
+            span = self.get_sequence(identifier, span_start, span_end)
+            for i in ranged[:n]:
+                _, start, end = regions[i]
+                results[i] = span[start - span_start : end - span_start]
+            del ranged[:n]
+        return results
+
     def _get_metadata(self, identifier: str) -> dict:
         ns, a = coerce_namespace(identifier).split(":", 2)
         r = list(self.sr.aliases.find_aliases(namespace=ns, alias=a))
@@ -242,30 +810,74 @@ class SeqRepoDataProxy(_SeqRepoDataProxyBase):
         }
 
 
-class SeqRepoRESTDataProxy(_SeqRepoDataProxyBase):
+class SeqRepoRESTDataProxy(_SequenceDataProxyBase):
     """DataProxy based on a REST instance of SeqRepo, as provided by seqrepo-rest-services"""
 
     rest_version = "1"
+    # subsequences are requested for exactly the range looked up, unless
+    # blocks (e.g. `sequence_block_size=8 * 2**10`) or windows are enabled
+    sequence_block_size = 0
+    sequence_window_growth = 0
 
-    def __init__(self, base_url: str, disable_healthcheck: bool = False) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        disable_healthcheck: bool = False,
+        pool_size: int = 10,
+        timeout: float | tuple[float, float] | None = (10, 60),
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        **kwargs,
+    ) -> None:
         """Initialize REST-based dataproxy instance.
 
+        Requests go through one `requests.Session`, which keeps connections
+        to the server alive for reuse.
+
         :param base_url: root URL to server
+        :param disable_healthcheck: if True, do not ping the server
+        :param pool_size: maximum number of connections kept alive, e.g. for
+            use from that many threads
+        :param timeout: timeout in seconds to connect and to read a response,
+            as for `requests`, or None to wait indefinitely
+        :param retries: number of retries of requests that fail to connect or
+            with a 5xx response status
+        :param backoff_factor: retries are delayed exponentially, by
+            `backoff_factor * 2 ** (retry - 1)` seconds
+        :param kwargs: cache options, as for `_SequenceDataProxyBase`
         """
-        super().__init__()
+        super().__init__(**kwargs)
         self.base_url = f"{base_url}/{self.rest_version}/"
+        self.timeout = timeout
+        self.pool_size = pool_size
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=("GET",),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         if not disable_healthcheck:
             ping_url = self.base_url + "ping"
-            ping_resp = requests.get(ping_url)  # noqa: S113
+            ping_resp = self._get(ping_url)
             ping_resp.raise_for_status()
 
+    def _get(self, url: str, params: dict | None = None) -> requests.Response:
+        _logger.info("Fetching %s", url)
+        return self.session.get(url, params=params, timeout=self.timeout)
+
     def _get_sequence(
         self, identifier: str, start: int | None = None, end: int | None = None
     ) -> str:
         url = self.base_url + f"sequence/{identifier}"
-        _logger.info("Fetching %s", url)
         params = {"start": start, "end": end}
-        resp = requests.get(url, params=params)  # noqa: S113
+        resp = self._get(url, params=params)
         if resp.status_code == 404:
             raise KeyError(identifier)
         resp.raise_for_status()
@@ -273,31 +885,600 @@ class SeqRepoRESTDataProxy(_SeqRepoDataProxyBase):
 
     def _get_metadata(self, identifier: str) -> dict:
         url = self.base_url + f"metadata/{identifier}"
-        _logger.info("Fetching %s", url)
-        resp = requests.get(url)  # noqa: S113
+        resp = self._get(url)
         if resp.status_code == 404:
             raise KeyError(identifier)
         resp.raise_for_status()
         return resp.json()
 
+    def get_sequences(
+        self, regions: Iterable[tuple[str, int | None, int | None]]
+    ) -> list[str]:
+        """Return the subsequences for `(identifier, start, end)` regions,
+        fetched concurrently over up to `pool_size` connections
+
+        :param regions: identifiers and interbase coordinates of subsequences
+        :return: subsequences, in the order of `regions`
+        :raise KeyError: if any identifier is not found
+        """
+        regions = list(regions)
+        if len(regions) < 2:
+            return super().get_sequences(regions)
+        with ThreadPoolExecutor(min(self.pool_size, len(regions))) as executor:
+            return list(executor.map(lambda r: self.get_sequence(*r), regions))
+
+    def close(self) -> None:
+        """Close the connections to the server"""
+        self.session.close()
+
+
+class AsyncSeqRepoRESTDataProxy:
+    """Asyncio interface to a SeqRepo REST service
+
+    Lookups run on a pool of worker threads through a `SeqRepoRESTDataProxy`,
+    whose caches are shared by all callers. At most `max_concurrency` requests
+    are in flight at a time, and concurrent identical lookups are coalesced
+    into a single request.
+
+    ```
+    async with AsyncSeqRepoRESTDataProxy("http://localhost:5000/seqrepo") as dp:
+        seqs = await dp.get_sequences([("NC_000001.11", 0, 10), ...])
+    ```
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_concurrency: int = 10,
+        disable_healthcheck: bool = False,
+        **kwargs,
+    ) -> None:
+        """Initialize asyncio REST-based dataproxy instance.
+
+        :param base_url: root URL to server
+        :param max_concurrency: maximum number of requests in flight at a time
+        :param disable_healthcheck: if True, do not ping the server. The ping
+            blocks the event loop, if any.
+        :param kwargs: session and cache options, as for `SeqRepoRESTDataProxy`
+        """
+        self.proxy = SeqRepoRESTDataProxy(
+            base_url,
+            disable_healthcheck=disable_healthcheck,
+            pool_size=max_concurrency,
+            **kwargs,
+        )
+        self._executor = ThreadPoolExecutor(
+            max_concurrency, thread_name_prefix="vrs-rest"
+        )
+        self._in_flight: dict[tuple, asyncio.Future] = {}
+
+    async def _call(self, func: Callable[..., _T], *args: object) -> _T:
+        key = (func.__name__, *args)
+        future = self._in_flight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, func, *args)
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield the shared request from the cancellation of any one caller
+        return await asyncio.shield(future)
+
+    async def get_sequence(
+        self, identifier: str, start: int | None = None, end: int | None = None
+    ) -> str:
+        """Return the specified sequence or subsequence, as for
+        `SeqRepoRESTDataProxy.get_sequence`
+        """
+        return await self._call(self.proxy.get_sequence, identifier, start, end)
+
+    async def get_sequences(
+        self, regions: Iterable[tuple[str, int | None, int | None]]
+    ) -> list[str]:
+        """Return the subsequences for `(identifier, start, end)` regions,
+        fetched concurrently
+
+        :param regions: identifiers and interbase coordinates of subsequences
+        :return: subsequences, in the order of `regions`
+        :raise KeyError: if any identifier is not found
+        """
+        return list(
+            await asyncio.gather(*(self.get_sequence(*region) for region in regions))
+        )
+
+    async def get_metadata(self, identifier: str) -> dict:
+        """Return the metadata for `identifier`, as for
+        `SeqRepoRESTDataProxy.get_metadata`
+        """
+        return await self._call(self.proxy.get_metadata, identifier)
+
+    async def derive_refget_accession(self, ac: str) -> str | None:
+        """Derive the refget accession from a public accession identifier, as
+        for `SeqRepoRESTDataProxy.derive_refget_accession`
+        """
+        return await self._call(self.proxy.derive_refget_accession, ac)
+
+    async def close(self) -> None:
+        """Wait for requests in flight, and close the connections to the server"""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self.proxy.close()
+
+    async def __aenter__(self) -> "AsyncSeqRepoRESTDataProxy":
+        """Return this proxy, to be closed on exit"""
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        """Close this proxy"""
+        await self.close()
+
+
+class _FaiRecord(NamedTuple):
+    length: int
+    offset: int
+    line_bases: int
+    line_width: int
+
+
+class FastaDataProxy(_SequenceDataProxyBase):
+    """DataProxy based on a local FASTA file, indexed with `samtools faidx`
+
+    Sequences are read from the memory-mapped FASTA file at the offsets given
+    by its .fai index, and are upper-cased. They are found by FASTA record
+    name, or by the aliases in a sidecar file (by default, the FASTA path
+    with suffix ".aliases.tsv"), which has lines of a record name and an
+    alias separated by a tab, e.g.::
+
+        chr1    GRCh38:1
+        chr1    refseq:NC_000001.11
+        chr1    ga4gh:SQ.Ya6Rs7DHhDeg7YaOSg1EoNi3U_nQ9SvO
+
+    `ga4gh:SQ` digests missing from the sidecar file are computed when first
+    needed (for all sequences at once, when looking one up by its digest);
+    `save_aliases()` writes them for later use.
+
+    The FASTA file stays mapped until `close()`, or the end of a `with` block.
+    """
+
+    aliases_suffix = ".aliases.tsv"
+
+    def __init__(
+        self, fasta_path: str | Path, aliases_path: str | Path | None = None, **kwargs
+    ) -> None:
+        """Initialize DataProxy instance.
+
+        :param fasta_path: path to a FASTA file, with index `fasta_path + ".fai"`
+        :param aliases_path: path to the sidecar alias file, if not the default
+        :param kwargs: cache options, as for `_SequenceDataProxyBase`
+        """
+        super().__init__(**kwargs)
+        self.fasta_path = Path(fasta_path)
+        if aliases_path is None:
+            aliases_path = self.fasta_path.with_name(
+                self.fasta_path.name + self.aliases_suffix
+            )
+        self.aliases_path = Path(aliases_path)
+        self._index = self._read_fai(
+            self.fasta_path.with_name(self.fasta_path.name + ".fai")
+        )
+        with self.fasta_path.open("rb") as f:
+            self._fasta = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._aliases = {name: [] for name in self._index}  # name -> aliases
+        self._names = {name: name for name in self._index}  # alias -> name
+        if self.aliases_path.exists():
+            with self.aliases_path.open() as f:
+                for line in f:
+                    if line.strip() and not line.startswith("#"):
+                        name, alias, *_ = line.rstrip("\n").split("\t")
+                        self._add_alias(name, alias)
+
+    @staticmethod
+    def _read_fai(path: Path) -> dict[str, _FaiRecord]:
+        index = {}
+        with path.open() as f:
+            for line in f:
+                name, *fields = line.rstrip("\n").split("\t")
+                index[name] = _FaiRecord(*(int(v) for v in fields[:4]))
+        return index
+
+    def _add_alias(self, name: str, alias: str) -> None:
+        if name not in self._index:
+            msg = f"{self.aliases_path}: no sequence {name!r} in {self.fasta_path}"
+            raise ValueError(msg)
+        if alias not in self._aliases[name]:
+            self._aliases[name].append(alias)
+        self._names[alias] = name
+
+    def _refget_accession(self, name: str) -> str:
+        """Return the ga4gh:SQ identifier of sequence `name`, computing it if needed"""
+        for alias in self._aliases[name]:
+            if alias.startswith("ga4gh:SQ."):
+                return alias
+        digest = sha512t24u(self._get_sequence(name).encode("ascii"))
+        alias = f"ga4gh:SQ.{digest}"
+        self._add_alias(name, alias)
+        return alias
+
+    @functools.cached_property
+    def _digest_names(self) -> dict[str, str]:
+        """Map the `ga4gh:SQ` identifiers of all sequences to their names"""
+        return {self._refget_accession(name): name for name in self._index}
+
+    def _resolve(self, identifier: str) -> str:
+        """Return the FASTA record name of `identifier`"""
+        name = self._names.get(identifier)
+        if name is None and ":" not in identifier:
+            with contextlib.suppress(ValueError):
+                name = self._names.get(coerce_namespace(identifier))
+        if name is None and identifier.startswith("ga4gh:SQ."):
+            name = self._digest_names.get(identifier)
+        if name is None:
+            raise KeyError(identifier)
+        return name
+
+    def _get_sequence(
+        self, identifier: str, start: int | None = None, end: int | None = None
+    ) -> str:
+        record = self._index[self._resolve(identifier)]
+        start, end, _ = slice(start, end).indices(record.length)
+        if end <= start:
+            return ""
+
+        def _offset(pos: int) -> int:
+            line, col = divmod(pos, record.line_bases)
+            return record.offset + line * record.line_width + col
+
+        raw = self._fasta[_offset(start) : _offset(end - 1) + 1]
+        return raw.replace(b"\n", b"").replace(b"\r", b"").decode("ascii").upper()
+
+    def _get_metadata(self, identifier: str) -> dict:
+        name = self._resolve(identifier)
+        self._refget_accession(name)
+        return {
+            "length": self._index[name].length,
+            "aliases": list(self._aliases[name]),
+        }
+
+    def save_aliases(self, path: str | Path | None = None) -> None:
+        """Write the aliases of all sequences, including computed `ga4gh:SQ`
+        digests, to the sidecar file (or `path`)
+        """
+        with Path(path or self.aliases_path).open("w") as f:
+            for name in self._index:
+                self._refget_accession(name)
+                for alias in self._aliases[name]:
+                    f.write(f"{name}\t{alias}\n")
+
+    def close(self) -> None:
+        """Unmap the FASTA file"""
+        self._fasta.close()
+
+    def __enter__(self) -> "FastaDataProxy":
+        """Return this proxy, to be closed on exit"""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close this proxy"""
+        self.close()
+
+
+class CachingDataProxy(_DataProxy):
+    """DataProxy that keeps the results of another in a persistent cache
+
+    Metadata, identifier translations and sequence blocks fetched from the
+    `inner` proxy are stored in a sqlite database at `path`, and are reused
+    across restarts. The database may be shared by concurrent processes. The
+    least recently used entries are evicted to keep the total size of keys and
+    values within `max_bytes`.
+
+    Sequences are cached by `ga4gh` identifier, in aligned blocks of
+    `sequence_block_size` residues, so that whole sequences are stored as
+    blocks too. With a block size of 0, requested ranges are cached as is,
+    except for whole or open-ended sequences, which are not persisted.
+
+    Results are also cached in memory, as for `_DataProxy`, in front of the
+    database.
+
+    By default, the proxy owns `inner`: `close()` closes it too, and its
+    sequence cache and blocks are turned off, since sequences are cached here
+    instead of in both. An `inner` proxy that is shared with other users
+    (`owns_inner=False`) is left as is.
+    """
+
+    max_bytes = 2**30
+    # an entry's access time is updated on a hit only if older than this many
+    # seconds, sparing most reads a write transaction
+    touch_interval = 60.0
+    # seconds to wait for the writes of other processes
+    busy_timeout = 60.0
+    # keys per query; below SQLite's bound parameter limit
+    max_query_keys = 900
+
+    def __init__(
+        self,
+        inner: _DataProxy,
+        path: str | Path,
+        max_bytes: int | None = None,
+        owns_inner: bool = True,
+        **kwargs,
+    ) -> None:
+        """Initialize DataProxy instance.
+
+        :param inner: data proxy to fetch uncached results from
+        :param path: path to the cache database, created if needed
+        :param max_bytes: maximum total size of the cached entries
+        :param owns_inner: if True, turn off the sequence cache of `inner`, and
+            close it with this proxy
+        :param kwargs: in-memory cache options, as for `_DataProxy`
+        """
+        super().__init__(**kwargs)
+        self.inner = inner
+        self.owns_inner = owns_inner
+        if owns_inner:
+            inner.sequence_block_size = 0
+            inner.sequence_cache_bytes = 0
+            sequence_cache = inner._caches["sequence"]  # noqa: SLF001
+            sequence_cache.maxsize = 0
+            sequence_cache.clear()
+        self.path = Path(path)
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._create_schema()
+
+    def _db(self) -> sqlite3.Connection:
+        """Return the database connection of the current thread"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            db.execute("pragma journal_mode = wal")
+            db.execute("pragma synchronous = normal")
+            self._local.db = db
+            with self._lock:
+                self._connections.append(db)
+        return db
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        db = self._db()
+        db.execute("begin immediate")
+        try:
+            yield db
+        except BaseException:
+            db.execute("rollback")
+            raise
+        db.execute("commit")
+
+    def _create_schema(self) -> None:
+        with self._transaction() as db:
+            db.execute(
+                "create table if not exists cache"
+                " (key text primary key, value blob not null,"
+                " size integer not null, atime real not null)"
+            )
+            db.execute("create index if not exists cache_atime_idx on cache (atime)")
+            # total size of entries, maintained by triggers
+            db.execute("create table if not exists cache_size (bytes integer not null)")
+            if db.execute("select 1 from cache_size").fetchone() is None:
+                db.execute("insert into cache_size select total(size) from cache")
+            db.execute(
+                "create trigger if not exists cache_insert after insert on cache"
+                " begin update cache_size set bytes = bytes + new.size; end"
+            )
+            db.execute(
+                "create trigger if not exists cache_delete after delete on cache"
+                " begin update cache_size set bytes = bytes - old.size; end"
+            )
+            db.execute(
+                "create trigger if not exists cache_update after update of size"
+                " on cache begin"
+                " update cache_size set bytes = bytes + new.size - old.size; end"
+            )
+
+    def _get_entries(self, keys: list[str]) -> dict[str, bytes]:
+        """Return the cached values of `keys`, where found"""
+        db = self._db()
+        now = time.time()
+        found = {}
+        stale = []
+        for i in range(0, len(keys), self.max_query_keys):
+            chunk = keys[i : i + self.max_query_keys]
+            placeholders = ",".join("?" * len(chunk))
+            rows = db.execute(
+                f"select key, value, atime from cache where key in ({placeholders})",  # noqa: S608
+                chunk,
+            )
+            for key, value, atime in rows:
+                found[key] = value
+                if now - atime > self.touch_interval:
+                    stale.append((now, key))
+        if stale:
+            with self._transaction() as db:
+                db.executemany("update cache set atime = ? where key = ?", stale)
+        return found
+
+    def _put_entries(self, entries: dict[str, bytes]) -> None:
+        """Cache `entries`, and evict the least recently used entries as
+        needed. Entries larger than `max_bytes` are not cached.
+        """
+        now = time.time()
+        rows = [(k, v, len(k) + len(v), now) for k, v in entries.items()]
+        with self._transaction() as db:
+            db.executemany(
+                "insert into cache (key, value, size, atime) values (?, ?, ?, ?)"
+                " on conflict (key) do update set value = excluded.value,"
+                " size = excluded.size, atime = excluded.atime",
+                [row for row in rows if row[2] <= self.max_bytes],
+            )
+            (excess,) = db.execute(
+                "select bytes - ? from cache_size", (self.max_bytes,)
+            ).fetchone()
+            evicted = []
+            if excess > 0:
+                for key, size in db.execute(
+                    "select key, size from cache order by atime"
+                ):
+                    evicted.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+            db.executemany("delete from cache where key = ?", evicted)
+
+    def _persisted(self, key: list, func: Callable[..., _T], *args: object) -> _T:
+        """Return the JSON value cached for `key`, or cache and return
+        `func(*args)`
+        """
+        db_key = json.dumps(key)
+        found = self._get_entries([db_key])
+        if db_key in found:
+            return json.loads(found[db_key])
+        value = func(*args)
+        self._put_entries({db_key: json.dumps(value).encode()})
+        return value
+
+    def get_metadata(self, identifier: str) -> dict:
+        """Return the metadata for `identifier`, from the cache if possible"""
+        return self._cached(
+            "metadata",
+            identifier,
+            self._persisted,
+            ["metadata", identifier],
+            self.inner.get_metadata,
+            identifier,
+        )
+
+    def _translate_sequence_identifier(
+        self, identifier: str, namespace: str | None
+    ) -> list[str]:
+        return self._persisted(
+            ["translate", identifier, namespace],
+            self.inner.translate_sequence_identifier,
+            identifier,
+            namespace,
+        )
+
+    def get_sequence(
+        self, identifier: str, start: int | None = None, end: int | None = None
+    ) -> str:
+        """Return the specified sequence or subsequence, from the cache if
+        possible
+        """
+        aliases = self.translate_sequence_identifier(identifier, "ga4gh")
+        ac = aliases[0] if aliases else identifier
+        block_size = self.sequence_block_size
+        if not block_size:
+            if start is None or end is None:
+                return self._cached(
+                    "sequence",
+                    (ac, start, end),
+                    self.inner.get_sequence,
+                    identifier,
+                    start,
+                    end,
+                )
+            return self._cached(
+                "sequence",
+                (ac, start, end),
+                self._persisted,
+                ["sequence", ac, start, end],
+                self.inner.get_sequence,
+                identifier,
+                start,
+                end,
+            )
+        if start is None or end is None or start < 0 or end < 0:
+            start, end, _ = slice(start, end).indices(
+                self.get_sequence_length(identifier)
+            )
+        if end <= start:
+            return ""
+        first = start // block_size
+        last = (end - 1) // block_size
+        cache = self._caches["sequence"]
+        blocks = [cache.get((ac, block_size, i)) for i in range(first, last + 1)]
+        keys = {
+            json.dumps(["block", ac, block_size, first + k]): k
+            for k, block in enumerate(blocks)
+            if block is _MISSING
+        }
+        if keys:
+            for key, block in self._get_entries(list(keys)).items():
+                blocks[keys[key]] = block
+                cache.put((ac, block_size, first + keys[key]), block)
+        fetched = {}
+        i = 0
+        while i < len(blocks):
+            if blocks[i] is not _MISSING:
+                i += 1
+                continue
+            j = i + 1
+            while j < len(blocks) and blocks[j] is _MISSING:
+                j += 1
+            block_start, block_end = (first + i) * block_size, (first + j) * block_size
+            if j == len(blocks):
+                block_end = min(block_end, self.get_sequence_length(identifier))
+            seq = (
+                self.inner.get_sequence(identifier, block_start, block_end)
+                if block_start < block_end
+                else ""
+            ).encode("ascii")
+            for k in range(i, j):
+                blocks[k] = seq[(k - i) * block_size : (k - i + 1) * block_size]
+                cache.put((ac, block_size, first + k), blocks[k])
+                fetched[json.dumps(["block", ac, block_size, first + k])] = blocks[k]
+            i = j
+        if fetched:
+            self._put_entries(fetched)
+        offset = start - first * block_size
+        return b"".join(blocks)[offset : offset + end - start].decode("ascii")
+
+    def close(self) -> None:
+        """Close the connections to the cache database, and the inner proxy
+        if owned
+        """
+        with self._lock:
+            for db in self._connections:
+                db.close()
+            self._connections.clear()
+        self._local = threading.local()
+        if self.owns_inner and hasattr(self.inner, "close"):
+            self.inner.close()
+
 
 class SequenceProxy(Sequence):
     """Provides efficient and transparent string-like access, including
     random access slicing and reversing, to a biological sequence that
     is stored elsewhere.
 
+    Accessed residues are kept in a window of the sequence. An access beyond
+    the window but within its size of it extends the window by at least its
+    size (and by at least the `sequence_window_growth` of the data proxy), so
+    that scanning a region residue by residue (e.g., rolling during
+    normalization) takes O(log n) fetches. Other accesses move the window.
+
+    Windows are at most `sequence_window_max` residues of the data proxy:
+    beyond that, extending the window slides it instead, dropping residues
+    from its other end, and larger ranges are fetched without being kept.
+
     """
 
     def __init__(self, dp: _DataProxy, alias: str) -> None:  # noqa: D107
         self.dp = dp
         self.alias = alias
-        self._md = self.dp.get_metadata(self.alias)
+        self._length = self.dp.get_sequence_length(self.alias)
+        self._window = ""
+        self._window_start = 0
 
     def __str__(self) -> str:  # noqa: D105
-        return self.dp.get_sequence(self.alias)
+        return self[:]
 
     def __len__(self):  # noqa: D105 ANN204
-        return self._md["length"]
+        return self._length
 
     def __reversed__(self):  # noqa: D105 ANN204
         msg = "Reversed iteration of a SequenceProxy is not implemented"
@@ -310,8 +1491,68 @@ class SequenceProxy(Sequence):
         if key.step is not None:
             msg = "Only contiguous sequence slices are supported"
             raise ValueError(msg)
-
-        return self.dp.get_sequence(self.alias, key.start, key.stop)
+        if not self.dp.sequence_window_growth:
+            return self.dp.get_sequence(self.alias, key.start, key.stop)
+
+        start, stop, _ = key.indices(self._length)
+        if stop <= start:
+            return ""
+        if stop - start > self.dp.sequence_window_max:
+            return self.dp.get_sequence(self.alias, start, stop)
+        self._load(start, stop)
+        offset = start - self._window_start
+        return self._window[offset : offset + stop - start]
+
+    def _load(self, start: int, stop: int) -> None:
+        """Update the window to include residues `start` to `stop`"""
+        window_start = self._window_start
+        window_stop = window_start + len(self._window)
+        if window_start <= start and stop <= window_stop:
+            return
+        growth = max(len(self._window), self.dp.sequence_window_growth)
+        if (
+            self._window
+            and window_start - growth <= start
+            and stop <= window_stop + growth
+        ):
+            new_start = (
+                max(0, window_start - growth) if start < window_start else window_start
+            )
+            new_stop = (
+                min(self._length, window_stop + growth)
+                if stop > window_stop
+                else window_stop
+            )
+            max_size = self.dp.sequence_window_max
+            if new_stop - new_start > max_size:
+                if start >= window_start:
+                    # slide, keeping as much as fits of the window before `start`
+                    new_stop = min(new_stop, start + max_size)
+                    new_start = new_stop - max_size
+                elif stop <= window_stop:
+                    new_start = max(new_start, stop - max_size)
+                    new_stop = new_start + max_size
+                else:
+                    new_start, new_stop = start, stop
+            # residues of the current window that are kept
+            keep_start = max(window_start, new_start)
+            keep_stop = min(window_stop, new_stop)
+            if keep_start < keep_stop:
+                left = right = ""
+                if new_start < keep_start:
+                    left = self.dp.get_sequence(self.alias, new_start, keep_start)
+                if new_stop > keep_stop:
+                    right = self.dp.get_sequence(self.alias, keep_stop, new_stop)
+                kept = self._window[
+                    keep_start - window_start : keep_stop - window_start
+                ]
+                self._window = left + kept + right
+            else:
+                self._window = self.dp.get_sequence(self.alias, new_start, new_stop)
+            self._window_start = new_start
+        else:
+            self._window = self.dp.get_sequence(self.alias, start, stop)
+            self._window_start = start
 
 
 def _isoformat(o: datetime.datetime) -> str:
@@ -353,6 +1594,16 @@ def create_dataproxy(uri: str | None = None) -> _DataProxy:
     * seqrepo+:../relative/path/to/seqrepo/root
     * seqrepo+http://localhost:5000/seqrepo
     * seqrepo+https://somewhere:5000/seqrepo
+    * fasta+file:///path/to/genome.fa (see `FastaDataProxy`)
+
+    Any of these may be given a persistent cache (see `CachingDataProxy`) with
+    query options `cache`, the path to the cache database, and optionally
+    `cache_bytes`, its maximum size, e.g.:
+
+    * seqrepo+https://somewhere:5000/seqrepo?cache=/tmp/seqrepo-cache.sqlite
+
+    Query option `alias_snapshot` gives the path to an alias snapshot to load
+    (see `_DataProxy.load_alias_snapshot()`).
 
     :raise ValueError: if URI doesn't match recognized schemes, e.g. is missing provider
         prefix (`"seqrepo+"`)
@@ -365,6 +1616,10 @@ def create_dataproxy(uri: str | None = None) -> _DataProxy:
 
     parsed_uri = urlparse(uri)
     scheme = parsed_uri.scheme
+    options = {k: v[-1] for k, v in parse_qs(parsed_uri.query).items()}
+    if parsed_uri.query:
+        parsed_uri = parsed_uri._replace(query="")
+        uri = parsed_uri.geturl()
 
     if "+" not in scheme:
         msg = "create_dataproxy scheme must include provider (e.g., `seqrepo+http:...`)"
@@ -384,8 +1639,25 @@ def create_dataproxy(uri: str | None = None) -> _DataProxy:
             msg = f"SeqRepo URI scheme {parsed_uri.scheme} not implemented"
             raise ValueError(msg)
 
+    elif provider == "fasta":
+        if proto in ("", "file"):
+            dp = FastaDataProxy(parsed_uri.path)
+        else:
+            msg = f"FASTA URI scheme {parsed_uri.scheme} not implemented"
+            raise ValueError(msg)
+
     else:
         msg = f"DataProxy provider {provider} not implemented"
         raise ValueError(msg)
 
+    if "cache" in options:
+        max_bytes = options.get("cache_bytes")
+        dp = CachingDataProxy(
+            dp,
+            options["cache"],
+            max_bytes=None if max_bytes is None else int(max_bytes),
+        )
+    if "alias_snapshot" in options:
+        dp.load_alias_snapshot(options["alias_snapshot"])
+
     return dp
@@ -1,18 +1,71 @@
 from pydantic.main import BaseModel
 
-from ga4gh.core import ga4gh_deref, ga4gh_enref
+from ga4gh.core import (
+    ga4gh_deref,
+    ga4gh_deref_async,
+    ga4gh_deref_many,
+    ga4gh_enref,
+    ga4gh_enref_async,
+    ga4gh_enref_many,
+)
 
 from .models import class_refatt_map
 
 
-def vrs_enref(o, object_store=None, return_id_obj_tuple: bool = False):
+def vrs_enref(
+    o, object_store=None, return_id_obj_tuple: bool = False, in_place: bool = False
+):
     return ga4gh_enref(
         o,
         cra_map=class_refatt_map,
         object_store=object_store,
         return_id_obj_tuple=return_id_obj_tuple,
+        in_place=in_place,
     )
 
 
-def vrs_deref(o, object_store) -> BaseModel:
-    return ga4gh_deref(o, cra_map=class_refatt_map, object_store=object_store)
+def vrs_enref_many(
+    objects,
+    object_store=None,
+    return_id_obj_tuple: bool = False,
+    in_place: bool = False,
+    batch_size: int = 1000,
+):
+    return ga4gh_enref_many(
+        objects,
+        cra_map=class_refatt_map,
+        object_store=object_store,
+        return_id_obj_tuple=return_id_obj_tuple,
+        in_place=in_place,
+        batch_size=batch_size,
+    )
+
+
+def vrs_deref(o, object_store, in_place: bool = False) -> BaseModel:
+    return ga4gh_deref(
+        o, cra_map=class_refatt_map, object_store=object_store, in_place=in_place
+    )
+
+
+def vrs_deref_many(objects, object_store, in_place: bool = False) -> list[BaseModel]:
+    return ga4gh_deref_many(
+        objects, cra_map=class_refatt_map, object_store=object_store, in_place=in_place
+    )
+
+
+async def vrs_enref_async(
+    o, object_store=None, return_id_obj_tuple: bool = False, in_place: bool = False
+):
+    return await ga4gh_enref_async(
+        o,
+        cra_map=class_refatt_map,
+        object_store=object_store,
+        return_id_obj_tuple=return_id_obj_tuple,
+        in_place=in_place,
+    )
+
+
+async def vrs_deref_async(o, object_store, in_place: bool = False) -> BaseModel:
+    return await ga4gh_deref_async(
+        o, cra_map=class_refatt_map, object_store=object_store, in_place=in_place
+    )
@@ -0,0 +1,218 @@
+"""Value codecs for object stores.
+
+A codec converts stored values to and from bytes. Codecs are referred to by
+a spec string, which is recorded by stores so that readers can select the
+matching codec automatically:
+
+    * ``dill``: any picklable Python object (default, and format of stores
+      written before codecs were configurable)
+    * ``vrs-json``: canonical JSON of VRS objects (sorted keys, no whitespace)
+    * ``pydantic-json``: JSON produced by pydantic's serializer; faster than
+      ``vrs-json`` but not canonical
+    * ``binary``: compact pickle of plain Python data; decoding only accepts
+      builtin types and never imports or calls code
+
+The JSON and binary codecs store VRS objects as plain data, in an envelope
+``{"__vrs__": <model name>, "value": <object>}`` from which the model class is
+restored, so stored values do not depend on Python class layouts. Other values
+must be JSON-compatible (respectively, builtin) data, and are restored as
+stored (top-level dicts that have a ``__vrs__`` key are themselves stored in
+an envelope, with a model name of None).
+
+Any codec may be combined with compression by appending ``+zlib`` or
+``+zstd`` to its name, e.g., ``pydantic-json+zstd``. zstd compression
+requires the ``zstandard`` package (``pip install 'ga4gh.vrs[zstd]'``).
+"""
+
+import inspect
+import io
+import json
+import pickle
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any
+
+import dill
+from canonicaljson import encode_canonical_json
+from pydantic import BaseModel, RootModel
+
+from ga4gh.vrs import models
+
+DEFAULT_CODEC = "dill"
+
+# VRS model classes by name (their `type` value), for restoring objects from
+# plain data
+_VRS_MODELS = {
+    name: cls
+    for name, cls in vars(models).items()
+    if inspect.isclass(cls)
+    and issubclass(cls, BaseModel)
+    and not issubclass(cls, RootModel)
+    and inspect.getmodule(cls) is models
+    and "type" in cls.model_fields
+}
+
+
+# key of the envelope of values stored as plain data; see module docstring
+_MODEL_KEY = "__vrs__"
+
+
+def _to_plain(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        plain = value.model_dump(exclude_none=True, warnings=False)
+        if _VRS_MODELS.get(type(value).__name__) is type(value):
+            return {_MODEL_KEY: type(value).__name__, "value": plain}
+        value = plain
+    if isinstance(value, dict) and _MODEL_KEY in value:
+        return {_MODEL_KEY: None, "value": value}
+    return value
+
+
+def _from_plain(value: Any) -> Any:
+    if isinstance(value, dict) and _MODEL_KEY in value:
+        cls = _VRS_MODELS.get(value[_MODEL_KEY])
+        return value["value"] if cls is None else cls(**value["value"])
+    return value
+
+
+class Codec(ABC):
+    """Convert values to and from bytes"""
+
+    name: str
+
+    @abstractmethod
+    def encode(self, value: Any) -> bytes:
+        """Return bytes representing `value`"""
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """Return the value represented by `data`"""
+
+
+class DillCodec(Codec):
+    """Serialize any Python object with dill"""
+
+    name = "dill"
+
+    def encode(self, value: Any) -> bytes:
+        return dill.dumps(value)
+
+    def decode(self, data: bytes) -> Any:
+        return dill.loads(data)  # noqa: S301
+
+
+class VrsJsonCodec(Codec):
+    """Serialize VRS objects as canonical JSON"""
+
+    name = "vrs-json"
+
+    def encode(self, value: Any) -> bytes:
+        return encode_canonical_json(_to_plain(value))
+
+    def decode(self, data: bytes) -> Any:
+        return _from_plain(json.loads(data))
+
+
+class PydanticJsonCodec(Codec):
+    """Serialize VRS objects as JSON with pydantic's serializer"""
+
+    name = "pydantic-json"
+
+    def encode(self, value: Any) -> bytes:
+        name = type(value).__name__
+        if _VRS_MODELS.get(name) is type(value):
+            data = value.model_dump_json(exclude_none=True, warnings=False)
+            return f'{{"{_MODEL_KEY}":"{name}","value":{data}}}'.encode()
+        return json.dumps(_to_plain(value), separators=(",", ":")).encode()
+
+    def decode(self, data: bytes) -> Any:
+        return _from_plain(json.loads(data))
+
+
+class _BuiltinsOnlyUnpickler(pickle.Unpickler):
+    def find_class(self, module: str, name: str) -> Any:
+        msg = f"Refusing to load {module}.{name} from binary-encoded value"
+        raise pickle.UnpicklingError(msg)
+
+
+class BinaryCodec(Codec):
+    """Serialize VRS objects as a compact pickle of builtin types"""
+
+    name = "binary"
+
+    def encode(self, value: Any) -> bytes:
+        return pickle.dumps(_to_plain(value), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def decode(self, data: bytes) -> Any:
+        return _from_plain(_BuiltinsOnlyUnpickler(io.BytesIO(data)).load())
+
+
+class CompressedCodec(Codec):
+    """Compress the output of another codec with zlib or zstd"""
+
+    compressions = ("zlib", "zstd")
+
+    def __init__(self, codec: Codec, compression: str) -> None:
+        """Wrap `codec`, compressing with `compression` (one of `compressions`)"""
+        if compression not in self.compressions:
+            msg = f"Unknown compression {compression!r}; expected one of {self.compressions}"
+            raise ValueError(msg)
+        if compression == "zstd":
+            import zstandard
+
+            # zstandard contexts are not thread-safe, so each thread has its own
+            self._zstandard = zstandard
+            self._zstd_local = threading.local()
+            self._zstd_contexts()
+            self._compress = self._zstd_compress
+            self._decompress = self._zstd_decompress
+        else:
+            self._compress = zlib.compress
+            self._decompress = zlib.decompress
+        self.codec = codec
+        self.name = f"{codec.name}+{compression}"
+
+    def _zstd_contexts(self) -> tuple[Any, Any]:
+        """Return the zstd compressor and decompressor of the current thread"""
+        contexts = getattr(self._zstd_local, "contexts", None)
+        if contexts is None:
+            contexts = (
+                self._zstandard.ZstdCompressor(),
+                self._zstandard.ZstdDecompressor(),
+            )
+            self._zstd_local.contexts = contexts
+        return contexts
+
+    def _zstd_compress(self, data: bytes) -> bytes:
+        return self._zstd_contexts()[0].compress(data)
+
+    def _zstd_decompress(self, data: bytes) -> bytes:
+        return self._zstd_contexts()[1].decompress(data)
+
+    def encode(self, value: Any) -> bytes:
+        return self._compress(self.codec.encode(value))
+
+    def decode(self, data: bytes) -> Any:
+        return self.codec.decode(self._decompress(data))
+
+
+CODECS = {
+    codec.name: codec
+    for codec in (DillCodec, VrsJsonCodec, PydanticJsonCodec, BinaryCodec)
+}
+
+
+def get_codec(spec: str | Codec) -> Codec:
+    """Return the codec for `spec`, e.g. ``"pydantic-json+zstd"``
+
+    :raise ValueError: if the codec or compression is unknown
+    """
+    if isinstance(spec, Codec):
+        return spec
+    name, _, compression = spec.partition("+")
+    if name not in CODECS:
+        msg = f"Unknown codec {name!r}; expected one of {list(CODECS)}"
+        raise ValueError(msg)
+    codec = CODECS[name]()
+    return CompressedCodec(codec, compression) if compression else codec
@@ -1,9 +1,160 @@
+import asyncio
+import atexit
+import base64
+import contextlib
+import hashlib
+import io
+import mmap
+import os
+import queue
+import re
 import sqlite3
-from collections.abc import MutableMapping
+import struct
+import threading
+import weakref
+import zlib
+from collections import OrderedDict
+from collections.abc import (
+    Callable,
+    ItemsView,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Sequence,
+    ValuesView,
+)
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from threading import Lock
-from typing import Any
+from typing import Any, BinaryIO, NamedTuple, Protocol
 
-import dill
+from pydantic import BaseModel
+
+from ga4gh.core import GA4GH_DIGEST_REGEXP, GA4GH_IR_REGEXP, Digest
+from ga4gh.core.pydantic import get_pydantic_root
+from ga4gh.vrs import models
+from ga4gh.vrs.extras.object_codecs import DEFAULT_CODEC, Codec, get_codec
+
+try:
+    import fcntl
+except ImportError:  # e.g. Windows
+    fcntl = None
+
+# PRAGMAs favouring bulk load and read throughput over durability of the most
+# recent transactions on power loss; see https://www.sqlite.org/pragma.html
+TUNED_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -262144,  # KiB, i.e. 256 MiB
+    "temp_store": "MEMORY",
+}
+
+# version of the store schema, recorded in the metadata table. Stores written
+# before versions were recorded are used without their indexed columns and
+# row count until upgraded with `Sqlite3MutableMapping.upgrade()`.
+SCHEMA_VERSION = 1
+
+_INDEX_COLUMNS = {
+    "type": "text",
+    "refget_accession": "text",
+    "start_pos": "integer",
+    "end_pos": "integer",
+}
+
+_PRAGMA_NAME_RE = re.compile(r"^[a-z_]+$")
+_PRAGMA_VALUE_RE = re.compile(r"^-?\w+$")
+
+
+# indexed bounds of open-ended Ranges, within the range of rtree_i32
+_MIN_POS = 0
+_MAX_POS = 2**31 - 1
+
+
+def _outer_bound(pos: Any, lower: bool) -> int | None:
+    """Return the outer bound of a start (`lower`) or end position: `pos` if
+    it is an int, or the lower or upper end of a Range, which is unbounded if
+    missing
+    """
+    if isinstance(pos, int):
+        return pos
+    if isinstance(pos, models.Range):
+        outer = pos.root[0] if lower else pos.root[1]
+        if outer is None:
+            return _MIN_POS if lower else _MAX_POS
+        return outer
+    return None
+
+
+def _sequence_location_columns(location: Any) -> tuple:
+    """Return the indexed (refget_accession, start_pos, end_pos) of a
+    SequenceLocation
+    """
+    if not isinstance(location, models.SequenceLocation):
+        return (None, None, None)
+    seq_ref = location.sequenceReference
+    if isinstance(seq_ref, models.SequenceReference):
+        refget_accession = seq_ref.refgetAccession
+    else:
+        refget_accession = None
+    start = _outer_bound(location.start, lower=True)
+    end = _outer_bound(location.end, lower=False)
+    if start is None or end is None or start > end:
+        start = end = None
+    return (refget_accession, start, end)
+
+
+def _set_pragmas(db: sqlite3.Connection, pragmas: Mapping[str, str | int]) -> None:
+    for name, value in pragmas.items():
+        # PRAGMA statements cannot be parameterized
+        if not _PRAGMA_NAME_RE.match(name) or not _PRAGMA_VALUE_RE.match(str(value)):
+            msg = f"Invalid PRAGMA: {name} = {value}"
+            raise ValueError(msg)
+        db.execute(f"pragma {name} = {value}")
+
+
+def _db_key(key: Any) -> Any:
+    """Return `key` as stored; Digests are stored by CURIE"""
+    return str(key) if isinstance(key, Digest) else key
+
+
+class _LazyDecodedMapping(Mapping):
+    """Read-only mapping of keys to encoded values, decoded on first access"""
+
+    def __init__(self, encoded: dict, codec: Codec) -> None:
+        self._encoded = encoded
+        self._decoded = {}
+        self._codec = codec
+
+    def __getitem__(self, key: Any) -> Any:
+        try:
+            return self._decoded[key]
+        except KeyError:
+            value = self._decoded[key] = self._codec.decode(self._encoded[key])
+            return value
+
+    def __iter__(self):
+        return iter(self._encoded)
+
+    def __len__(self):
+        return len(self._encoded)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._encoded
+
+
+class _SqliteItemsView(ItemsView):
+    def __iter__(self):
+        decode = self._mapping.codec.decode
+        for key, value in self._mapping._iter_rows("key, value"):  # noqa: SLF001
+            yield key, decode(value)
+
+
+class _SqliteValuesView(ValuesView):
+    def __iter__(self):
+        decode = self._mapping.codec.decode
+        for (value,) in self._mapping._iter_rows("value"):  # noqa: SLF001
+            yield decode(value)
 
 
 class Sqlite3MutableMapping(MutableMapping):
@@ -13,14 +164,31 @@ class Sqlite3MutableMapping(MutableMapping):
     If not used as a contextmanager, user must call commit and/or close.
     """
 
+    # keys per query in get_many/contains_many; below SQLite's bound parameter limit
+    max_query_keys = 900
+    # rows fetched at a time when iterating over items and values
+    fetch_size = 1000
+    # indexed columns of recently written SequenceLocations, by key, so that
+    # values referring to them are indexed without reading them back
+    location_cache_size = 2**16
+
     def __init__(
-        self, sqlite3_db: str | sqlite3.Connection, autocommit: bool = True
+        self,
+        sqlite3_db: str | sqlite3.Connection,
+        autocommit: bool = True,
+        pragmas: Mapping[str, str | int] | None = None,
+        codec: str | Codec | None = None,
     ) -> None:
         """Connect to the sqlite3 database specified by an existing sqlite3.Connection
         or a connection string.
 
         - autocommit: if False, disables commit after every setitem/delitem.
                 Significant performance implication (>10X speedup)
+        - pragmas: PRAGMA name/value pairs applied to the connection, e.g.
+                `TUNED_PRAGMAS` for WAL journaling and a larger page cache
+        - codec: value codec spec (see `ga4gh.vrs.extras.object_codecs`),
+                recorded in the store when it is created. If not given, the
+                recorded codec is used, or `dill` for new stores.
         """
         if isinstance(sqlite3_db, str):
             sqlite3_db = sqlite3.connect(sqlite3_db, check_same_thread=True)
@@ -28,61 +196,500 @@ class Sqlite3MutableMapping(MutableMapping):
         self.autocommit = autocommit
         self._closed_lock = Lock()
         self._closed = False
+        self._locations = OrderedDict()
+        _set_pragmas(self.db, pragmas or {})
         self._create_schema()
+        self.codec = self._init_codec(codec)
+
+    def _read_db(self) -> sqlite3.Connection:
+        """Return the connection used for reads"""
+        return self.db
 
     def _create_schema(self) -> None:
+        """Create the schema of a new store. Existing stores are not modified,
+        so that they can be opened read-only; see `upgrade()`.
+        """
         cur = self.db.cursor()
         try:
+            tables = {
+                row[0]
+                for row in cur.execute(
+                    "select name from sqlite_master where type = 'table'"
+                )
+            }
+            self._schema_version = 0
+            if "metadata" in tables:
+                row = cur.execute(
+                    "select value from metadata where key = 'schema_version'"
+                ).fetchone()
+                self._schema_version = int(row[0]) if row else 0
+            self._has_rtree = "mapping_rtree" in tables
+            if "mapping" in tables and (
+                self._schema_version >= SCHEMA_VERSION
+                or cur.execute("select 1 from mapping limit 1").fetchone()
+            ):
+                return
             cur.execute("create table if not exists mapping (key text, value blob)")
             cur.execute(
                 "create unique index if not exists mapping_key_idx on mapping (key)"
             )
+            self._upgrade_schema(cur)
             self.commit()
         finally:
             cur.close()
 
+    def _upgrade_schema(self, cur: sqlite3.Cursor) -> None:
+        cur.execute(
+            "create table if not exists metadata (key text primary key, value text)"
+        )
+        # indexed attributes of stored VRS objects; see _index_columns
+        columns = {row[1] for row in cur.execute("pragma table_info(mapping)")}
+        for column, column_type in _INDEX_COLUMNS.items():
+            if column not in columns:
+                cur.execute(f"alter table mapping add column {column} {column_type}")
+        cur.execute("create index if not exists mapping_type_idx on mapping (type)")
+        cur.execute(
+            "create index if not exists mapping_location_idx"
+            " on mapping (refget_accession, start_pos)"
+        )
+        self._create_count(cur)
+        self._has_rtree = self._create_rtree(cur)
+        cur.execute(
+            "insert or replace into metadata(key, value) values ('schema_version', ?)",
+            (str(SCHEMA_VERSION),),
+        )
+        self._schema_version = SCHEMA_VERSION
+
+    @property
+    def _indexed(self) -> bool:
+        """Whether the store has the indexed columns and row count"""
+        return self._schema_version >= SCHEMA_VERSION
+
+    def upgrade(self) -> None:
+        """Upgrade a store written by an earlier version of this module to the
+        current schema, adding the indexed columns used by `find()` and the
+        row count used by `len()`, and indexing all values. The store must be
+        writable. Stores opened by earlier versions of this module afterwards
+        are not kept indexed; call `reindex()` to repair them.
+        """
+        if self._indexed:
+            return
+        cur = self.db.cursor()
+        try:
+            self._upgrade_schema(cur)
+            cur.execute(
+                "insert or ignore into metadata(key, value) values ('codec', ?)",
+                (self.codec.name,),
+            )
+        finally:
+            cur.close()
+        self.reindex()
+        self.commit()
+
+    def _create_count(self, cur: sqlite3.Cursor) -> None:
+        """Create a row count of the mapping table, kept by `set_many()` and
+        `__delitem__()` from the number of rows each statement changed
+        """
+        cur.execute("create table if not exists mapping_count (n integer not null)")
+        cur.execute("delete from mapping_count")
+        cur.execute("insert into mapping_count select count(*) from mapping")
+
+    def _create_rtree(self, cur: sqlite3.Cursor) -> bool:
+        """Create an R*Tree index of location intervals by sequence, maintained
+        by triggers. Sequences are numbered in `mapping_accession`, so that
+        the index is searched only on the sequence queried. Returns False if
+        this sqlite3 build does not support R*Trees.
+        """
+        try:
+            cur.execute(
+                "create virtual table if not exists mapping_rtree using rtree_i32"
+                "(id, accession_min, accession_max, start_pos, end_pos)"
+            )
+        except sqlite3.OperationalError:
+            return False
+        cur.executescript(
+            """
+            create table if not exists mapping_accession
+                (id integer primary key, refget_accession text unique not null);
+            create trigger if not exists mapping_rtree_insert after insert on mapping
+            when new.refget_accession is not null
+                and new.start_pos is not null and new.end_pos is not null
+            begin
+                insert or ignore into mapping_accession(refget_accession)
+                values (new.refget_accession);
+                insert into mapping_rtree
+                select new.rowid, id, id, new.start_pos, new.end_pos
+                from mapping_accession where refget_accession = new.refget_accession;
+            end;
+            create trigger if not exists mapping_rtree_delete after delete on mapping
+            begin
+                delete from mapping_rtree where id = old.rowid;
+            end;
+            create trigger if not exists mapping_rtree_update
+            after update of refget_accession, start_pos, end_pos on mapping
+            begin
+                delete from mapping_rtree where id = old.rowid;
+                insert or ignore into mapping_accession(refget_accession)
+                select new.refget_accession where new.refget_accession is not null;
+                insert into mapping_rtree
+                select new.rowid, id, id, new.start_pos, new.end_pos
+                from mapping_accession where refget_accession = new.refget_accession
+                and new.start_pos is not null and new.end_pos is not null;
+            end;
+            """
+        )
+        return True
+
+    @staticmethod
+    def _location_of(value: Any) -> tuple[str | None, Any]:
+        """Return the type of a stored value, and its location: a
+        SequenceLocation (the value itself, for locations), the key of one,
+        or None
+        """
+        obj_type = getattr(value, "type", None)
+        if not isinstance(value, BaseModel) or not isinstance(obj_type, str):
+            return (None, None)
+        if obj_type == "SequenceLocation":
+            return (obj_type, value)
+        location = getattr(value, "location", None)
+        location_id = get_pydantic_root(location)
+        if isinstance(location_id, str):
+            return (obj_type, location_id)
+        return (obj_type, location)
+
+    def _index_columns(self, value: Any, pending: Mapping) -> tuple:
+        """Return (type, refget_accession, start_pos, end_pos) for a stored value
+
+        Locations of objects are indexed by the outer bounds of their
+        SequenceLocation. A location given as a reference is looked up in
+        `pending` (values being written together), then among recently
+        written locations, and then in the indexed columns of the store.
+        """
+        obj_type, location = self._location_of(value)
+        if obj_type is None:
+            return (None, None, None, None)
+        if isinstance(location, str):
+            location_id = location
+            location = pending.get(location_id)
+            if location is None:
+                return (obj_type, *self._location_columns(location_id))
+        return (obj_type, *_sequence_location_columns(location))
+
+    def _location_columns(self, key: str) -> tuple:
+        """Return the indexed (refget_accession, start_pos, end_pos) of the
+        stored SequenceLocation `key`
+        """
+        columns = self._locations.get(key)
+        if columns is None:
+            row = self.db.execute(
+                "select refget_accession, start_pos, end_pos from mapping"
+                " where key = ? and type = 'SequenceLocation'",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return (None, None, None)
+            columns = tuple(row)
+            self._remember_location(key, columns)
+        else:
+            self._locations.move_to_end(key)
+        return columns
+
+    def _remember_location(self, key: str, columns: tuple) -> None:
+        self._locations[key] = columns
+        self._locations.move_to_end(key)
+        while len(self._locations) > self.location_cache_size:
+            self._locations.popitem(last=False)
+
+    def reindex(self) -> None:
+        """Recompute indexed columns for all values, e.g. for values written
+        by earlier versions of this module
+        """
+        if not self._indexed:
+            self.upgrade()
+            return
+        self._locations.clear()
+        cur = self.db.cursor()
+        try:
+            # objects with locations in other batches, indexed once all
+            # locations are
+            cur.execute(
+                "create temp table if not exists reindex_refs"
+                " (id integer primary key, location text not null)"
+            )
+            cur.execute("delete from temp.reindex_refs")
+            last_rowid = 0
+            while rows := cur.execute(
+                "select rowid, key, value from mapping where rowid > ?"
+                " order by rowid limit ?",
+                (last_rowid, self.fetch_size),
+            ).fetchall():
+                last_rowid = rows[-1][0]
+                values = {key: self.codec.decode(value) for _, key, value in rows}
+                columns = []
+                refs = []
+                for rowid, key, _ in rows:
+                    value = values[key]
+                    obj_type, location = self._location_of(value)
+                    if isinstance(location, str) and location not in values:
+                        refs.append((rowid, location))
+                        columns.append((obj_type, None, None, None, rowid))
+                    else:
+                        columns.append((*self._index_columns(value, values), rowid))
+                cur.executemany(
+                    "update mapping set type = ?, refget_accession = ?,"
+                    " start_pos = ?, end_pos = ? where rowid = ?",
+                    columns,
+                )
+                cur.executemany("insert into temp.reindex_refs values (?, ?)", refs)
+            cur.execute(
+                """
+                update mapping set (refget_accession, start_pos, end_pos) = (
+                    select l.refget_accession, l.start_pos, l.end_pos
+                    from temp.reindex_refs r join mapping l on l.key = r.location
+                    where r.id = mapping.rowid and l.type = 'SequenceLocation'
+                )
+                where rowid in (select id from temp.reindex_refs)
+                """
+            )
+            cur.execute("drop table temp.reindex_refs")
+        finally:
+            cur.close()
+        if self.autocommit:
+            self.commit()
+
+    def find(
+        self,
+        type: str | None = None,  # noqa: A002
+        refget_accession: str | None = None,
+        start: int | None = None,
+        end: int | None = None,
+    ) -> Iterator[tuple[Any, Any]]:
+        """Yield (key, value) pairs for stored VRS objects matching all given
+        criteria, without decoding non-matching values.
+
+        - type: VRS object type, e.g. "CopyNumberChange"
+        - refget_accession: sequence of the object's location, e.g.
+                "SQ.F-LrLMe1SRpfUZHkQmvkVKFEGaoDeHul" (with or without "ga4gh:").
+                Use a data proxy's `derive_refget_accession` for other accessions.
+        - start, end: inter-residue interval on `refget_accession` that the
+                object's location must overlap
+        """
+        if not self._indexed:
+            msg = "Store has no indexed columns; upgrade it with upgrade()"
+            raise ValueError(msg)
+        tables = "mapping m"
+        conditions = []
+        params = []
+        if type is not None:
+            conditions.append("m.type = ?")
+            params.append(type)
+        if refget_accession is not None:
+            conditions.append("m.refget_accession = ?")
+            params.append(refget_accession.removeprefix("ga4gh:"))
+        if start is not None or end is not None:
+            if refget_accession is None:
+                msg = "refget_accession is required to find by start or end"
+                raise ValueError(msg)
+            start_col, end_col = "m.start_pos", "m.end_pos"
+            if self._has_rtree:
+                # the R*Tree is searched first, for intervals on the sequence
+                tables = "mapping_rtree r cross join mapping m on m.rowid = r.id"
+                start_col, end_col = "r.start_pos", "r.end_pos"
+                conditions.append(
+                    "r.accession_min = (select id from mapping_accession"
+                    " where refget_accession = ?)"
+                )
+                params.append(refget_accession.removeprefix("ga4gh:"))
+            # intervals overlap if they share a residue, or if either is empty
+            # and lies within or at a bound of the other
+            empty = "1" if start is not None and start == end else "0"
+            if end is not None:
+                conditions.append(
+                    f"{start_col} <= ? and ({start_col} < ?"
+                    f" or {start_col} = {end_col} or {empty})"
+                )
+                params += [end, end]
+            if start is not None:
+                conditions.append(
+                    f"{end_col} >= ? and ({end_col} > ?"
+                    f" or {start_col} = {end_col} or {empty})"
+                )
+                params += [start, start]
+
+        sql = f"select m.key, m.value from {tables}"  # noqa: S608
+        if conditions:
+            sql += " where " + " and ".join(conditions)
+        cur = self._read_db().cursor()
+        try:
+            for key, value in cur.execute(sql, params):
+                yield key, self.codec.decode(value)
+        finally:
+            cur.close()
+
+    def _init_codec(self, codec: str | Codec | None) -> Codec:
+        cur = self.db.cursor()
+        try:
+            row = None
+            if (
+                self._indexed
+                or cur.execute(
+                    "select 1 from sqlite_master where type = 'table' and name = 'metadata'"
+                ).fetchone()
+            ):
+                row = cur.execute(
+                    "select value from metadata where key = 'codec'"
+                ).fetchone()
+            if row is not None:
+                recorded = row[0]
+            elif cur.execute("select 1 from mapping limit 1").fetchone():
+                # values written before the codec was recorded are dill-encoded
+                recorded = DEFAULT_CODEC
+            else:
+                recorded = None
+
+            codec = get_codec(codec or recorded or DEFAULT_CODEC)
+            if recorded is not None and recorded != codec.name:
+                msg = f"Store is encoded with codec {recorded!r}, not {codec.name!r}"
+                raise ValueError(msg)
+            if recorded is None:
+                # a new store; existing stores record their codec on upgrade
+                cur.execute(
+                    "insert into metadata(key, value) values ('codec', ?)",
+                    (codec.name,),
+                )
+                self.commit()
+            return codec
+        finally:
+            cur.close()
+
     def __del__(self) -> None:
-        self.close()
+        # not set if __init__ failed before the store was opened
+        if hasattr(self, "_closed"):
+            self.close()
 
     def __delitem__(self, key: Any) -> None:
         # Raise KeyError
         self[key]
         # Delete if found
+        self._locations.pop(_db_key(key), None)
         cur = self.db.cursor()
         try:
-            cur.execute("delete from mapping where key = ?", (key,))
+            cur.execute("delete from mapping where key = ?", (_db_key(key),))
+            if self._indexed and cur.rowcount > 0:
+                cur.execute("update mapping_count set n = n - ?", (cur.rowcount,))
             if self.autocommit:
                 self.commit()
         finally:
             cur.close()
 
     def __setitem__(self, key: Any, value: Any) -> None:
+        self.set_many({key: value})
+
+    def set_many(self, items: Mapping | Iterable[tuple[Any, Any]]) -> None:
+        """Insert or replace many key/value pairs with a single statement,
+        committed once at the end if autocommit is set
+        """
+        if isinstance(items, Mapping):
+            items = items.items()
+        # keyed as stored, so that references within the batch are resolved
+        items = {_db_key(key): value for key, value in items}
         cur = self.db.cursor()
         try:
-            ser = dill.dumps(value)
-            cur.execute(
-                "insert or replace into mapping(key, value) values (?, ?)",
-                (key, sqlite3.Binary(ser)),
-            )
+            if self._indexed:
+                rows = list(self._indexed_rows(items))
+                # rows are inserted or updated in place rather than replaced, so
+                # that no delete triggers are needed, and the count is kept from
+                # the number inserted
+                cur.executemany(
+                    "insert or ignore into mapping(key, value, type,"
+                    " refget_accession, start_pos, end_pos) values (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                inserted = cur.rowcount
+                if inserted < len(rows):
+                    cur.executemany(
+                        "update mapping set value = ?2, type = ?3,"
+                        " refget_accession = ?4, start_pos = ?5, end_pos = ?6"
+                        " where key = ?1 and (value is not ?2 or type is not ?3"
+                        " or refget_accession is not ?4 or start_pos is not ?5"
+                        " or end_pos is not ?6)",
+                        rows,
+                    )
+                if inserted > 0:
+                    cur.execute("update mapping_count set n = n + ?", (inserted,))
+            else:
+                cur.executemany(
+                    "insert or replace into mapping(key, value) values (?, ?)",
+                    (
+                        (key, sqlite3.Binary(self.codec.encode(value)))
+                        for key, value in items.items()
+                    ),
+                )
             if self.autocommit:
                 self.commit()
         finally:
             cur.close()
 
+    def _indexed_rows(self, items: dict) -> Iterator[tuple]:
+        """Yield the rows of `items`, with their indexed columns"""
+        for key, value in items.items():
+            columns = self._index_columns(value, items)
+            if columns[0] == "SequenceLocation":
+                self._remember_location(key, columns[1:])
+            else:
+                self._locations.pop(key, None)
+            yield (key, sqlite3.Binary(self.codec.encode(value)), *columns)
+
+    def update(self, other=(), /, **kwds) -> None:
+        if not isinstance(other, Mapping) and hasattr(other, "keys"):
+            other = {key: other[key] for key in other.keys()}  # noqa: SIM118
+        self.set_many(other)
+        if kwds:
+            self.set_many(kwds)
+
     def __getitem__(self, key: Any) -> Any:
-        cur = self.db.cursor()
+        cur = self._read_db().cursor()
+        try:
+            row = cur.execute(
+                "select value from mapping where key = ?", (_db_key(key),)
+            ).fetchone()
+        finally:
+            cur.close()
+        if row is None:
+            raise KeyError("Key not found: " + str(key))
+        return self.codec.decode(row[0])
+
+    def _select_in(self, column: str, keys: Iterable) -> Iterator[tuple]:
+        """Yield (key, column) rows for the given keys that are in the store,
+        querying `max_query_keys` keys at a time
+        """
+        given = {_db_key(key): key for key in keys}
+        db_keys = list(given)
+        cur = self._read_db().cursor()
         try:
-            rows = cur.execute("select value from mapping where key = ?", (key,))
-            row0 = next(rows)
-            if row0:
-                return dill.loads(row0[0])  # noqa: S301
-        except StopIteration as e:
-            raise KeyError("Key not found: " + str(key)) from e
+            for i in range(0, len(db_keys), self.max_query_keys):
+                chunk = db_keys[i : i + self.max_query_keys]
+                placeholders = ",".join("?" * len(chunk))
+                for key, value in cur.execute(
+                    f"select key, {column} from mapping where key in ({placeholders})",  # noqa: S608
+                    chunk,
+                ):
+                    yield given[key], value
         finally:
             cur.close()
 
+    def get_many(self, keys: Iterable) -> Mapping:
+        """Return a read-only mapping of the given keys that are in the store
+        to their values. Values are decoded when first accessed.
+        """
+        return _LazyDecodedMapping(dict(self._select_in("value", keys)), self.codec)
+
+    def contains_many(self, keys: Iterable) -> set:
+        """Return the subset of the given keys that are in the store"""
+        return {key for key, _ in self._select_in("1", keys)}
+
     def __iter__(self):
-        cur = self.db.cursor()
+        cur = self._read_db().cursor()
         try:
             rows = cur.execute("select key from mapping")
             for row in rows:
@@ -91,16 +698,65 @@ class Sqlite3MutableMapping(MutableMapping):
             cur.close()
 
     def __len__(self):
-        cur = self.db.cursor()
+        cur = self._read_db().cursor()
+        try:
+            if not self._indexed:
+                return cur.execute("select count(*) from mapping").fetchone()[0]
+            return cur.execute("select n from mapping_count").fetchone()[0]
+        finally:
+            cur.close()
+
+    def _iter_rows(self, columns: str) -> Iterator[tuple]:
+        cur = self._read_db().cursor()
+        cur.arraysize = self.fetch_size
+        try:
+            cur.execute(f"select {columns} from mapping")  # noqa: S608
+            while rows := cur.fetchmany():
+                yield from rows
+        finally:
+            cur.close()
+
+    def items(self) -> ItemsView:
+        """Return a view of (key, value) pairs that iterates with a single query"""
+        return _SqliteItemsView(self)
+
+    def values(self) -> ValuesView:
+        """Return a view of values that iterates with a single query"""
+        return _SqliteValuesView(self)
+
+    def page(
+        self, limit: int = 1000, after: Any = None
+    ) -> tuple[list[tuple[Any, Any]], Any]:
+        """Return up to `limit` (key, value) pairs in key order, starting after
+        key `after`, and the resume token to pass as `after` for the next page
+        (None when there are no more pages)
+        """
+        cur = self._read_db().cursor()
         try:
-            rows = cur.execute("select count(*) from mapping")
-            return list(rows)[0][0]  # noqa: RUF015
+            if after is None:
+                cur.execute(
+                    "select key, value from mapping order by key limit ?", (limit,)
+                )
+            else:
+                cur.execute(
+                    "select key, value from mapping where key > ? order by key limit ?",
+                    (after, limit),
+                )
+            rows = cur.fetchall()
         finally:
             cur.close()
+        items = [(key, self.codec.decode(value)) for key, value in rows]
+        next_after = items[-1][0] if len(items) == limit else None
+        return items, next_after
 
     def commit(self) -> None:
         self.db.commit()
 
+    def compact(self) -> None:
+        """Commit and rebuild the database file to reclaim unused space"""
+        self.commit()
+        self.db.execute("vacuum")
+
     def close(self) -> None:
         with self._closed_lock:
             if not self._closed:
@@ -114,3 +770,1381 @@ class Sqlite3MutableMapping(MutableMapping):
 
     def __exit__(self, exc_type, exc_value, traceback) -> None:
         self.db.__exit__(exc_type, exc_value, traceback)
+
+
+class _ThreadConnection:
+    """Connection used by a single thread, closed when the thread exits"""
+
+    def __init__(self, db: sqlite3.Connection) -> None:
+        self.db = db
+        self.close = weakref.finalize(self, db.close)
+
+
+class ConcurrentSqlite3MutableMapping(Sqlite3MutableMapping):
+    """Sqlite3MutableMapping that can be shared between threads.
+
+    Each thread reads through its own read-only connection, so concurrent
+    lookups do not contend on a single connection; the connection is closed
+    when the thread exits. Writes go through one connection and are
+    serialized. The database is put in WAL mode so that readers are not
+    blocked by the writer.
+
+    Readers see committed values, except while there are uncommitted writes
+    (with `autocommit=False`): reads then go through the writer connection,
+    so that written values can be read back before they are committed.
+    """
+
+    def __init__(
+        self,
+        sqlite3_db: str,
+        autocommit: bool = True,
+        pragmas: Mapping[str, str | int] | None = None,
+        codec: str | Codec | None = None,
+    ) -> None:
+        """Open the sqlite3 database file at path `sqlite3_db`.
+
+        Parameters are as for `Sqlite3MutableMapping`. `pragmas` other than
+        `journal_mode` are also applied to each reader connection.
+        """
+        if not isinstance(sqlite3_db, str) or sqlite3_db == ":memory:":
+            msg = "ConcurrentSqlite3MutableMapping requires a database file path"
+            raise ValueError(msg)
+        self._reader_uri = Path(sqlite3_db).resolve().as_uri() + "?mode=ro"
+        self._reader_pragmas = {
+            k: v for k, v in (pragmas or {}).items() if k != "journal_mode"
+        }
+        self._local = threading.local()
+        self._readers = weakref.WeakSet()
+        self._write_lock = threading.RLock()
+        super().__init__(
+            sqlite3.connect(sqlite3_db, check_same_thread=False),
+            autocommit=autocommit,
+            pragmas={**(pragmas or {}), "journal_mode": "WAL"},
+            codec=codec,
+        )
+
+    def _read_db(self) -> sqlite3.Connection:
+        if self.db.in_transaction:
+            return self.db
+        reader = getattr(self._local, "reader", None)
+        if reader is None:
+            # closed by the thread's exit, or by whichever thread closes the store
+            db = sqlite3.connect(self._reader_uri, uri=True, check_same_thread=False)
+            _set_pragmas(db, self._reader_pragmas)
+            reader = self._local.reader = _ThreadConnection(db)
+            with self._write_lock:
+                self._readers.add(reader)
+        return reader.db
+
+    def __delitem__(self, key: Any) -> None:
+        with self._write_lock:
+            super().__delitem__(key)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        with self._write_lock:
+            super().__setitem__(key, value)
+
+    def set_many(self, items: Mapping | Iterable[tuple[Any, Any]]) -> None:
+        with self._write_lock:
+            super().set_many(items)
+
+    def commit(self) -> None:
+        with self._write_lock:
+            super().commit()
+
+    def close(self) -> None:
+        with self._write_lock:
+            for reader in list(self._readers):
+                reader.close()
+            self._readers.clear()
+            super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        with self._write_lock:
+            super().__exit__(exc_type, exc_value, traceback)
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of a `CachedMapping`"""
+
+    hits: int
+    misses: int
+    evictions: int
+    maxsize: int
+    currsize: int
+
+
+class CachedMapping(MutableMapping):
+    """LRU cache of decoded values in front of another object store, e.g. a
+    Sqlite3MutableMapping.
+
+    With `write_back=False` (the default), writes go to the cache and the
+    store immediately. With `write_back=True`, written values are held in
+    the cache and only written to the store by `flush()`, `commit()`,
+    `close()`, or when they are evicted.
+
+    Not thread-safe.
+    """
+
+    def __init__(
+        self, store: MutableMapping, maxsize: int = 100_000, write_back: bool = False
+    ) -> None:
+        if maxsize < 1:
+            msg = "maxsize must be a positive integer"
+            raise ValueError(msg)
+        self.store = store
+        self.maxsize = maxsize
+        self.write_back = write_back
+        self._cache = OrderedDict()
+        self._dirty = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(
+            self.hits, self.misses, self.evictions, self.maxsize, len(self._cache)
+        )
+
+    def _cache_put(self, key: Any, value: Any) -> None:
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            old_key, old_value = self._cache.popitem(last=False)
+            self.evictions += 1
+            if old_key in self._dirty:
+                self._dirty.discard(old_key)
+                self.store[old_key] = old_value
+
+    def __getitem__(self, key: Any) -> Any:
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            value = self.store[key]
+            self._cache_put(key, value)
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+        return value
+
+    def get_many(self, keys: Iterable) -> dict:
+        """Return a dict of the given keys that are in the store to their
+        values, fetching cache misses in bulk if the store supports it
+        """
+        found = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            if key in self._cache:
+                found[key] = self._cache[key]
+                self._cache.move_to_end(key)
+            else:
+                missing.append(key)
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        if missing:
+            if hasattr(self.store, "get_many"):
+                fetched = self.store.get_many(missing)
+            else:
+                fetched = {key: self.store[key] for key in missing if key in self.store}
+            for key, value in fetched.items():
+                self._cache_put(key, value)
+                found[key] = value
+        return found
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if self.write_back:
+            self._dirty.add(key)
+        else:
+            self.store[key] = value
+        self._cache_put(key, value)
+
+    def set_many(self, items: Mapping | Iterable[tuple[Any, Any]]) -> None:
+        if isinstance(items, Mapping):
+            items = items.items()
+        items = dict(items)
+        if self.write_back:
+            self._dirty.update(items)
+        else:
+            _set_many(self.store, items)
+        for key, value in items.items():
+            self._cache_put(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        self._cache.pop(key, None)
+        if key in self._dirty:
+            # may not have been written to the store yet
+            self._dirty.discard(key)
+            self.store.pop(key, None)
+        else:
+            del self.store[key]
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._cache or key in self.store
+
+    def __iter__(self):
+        self.flush()
+        return iter(self.store)
+
+    def __len__(self):
+        self.flush()
+        return len(self.store)
+
+    def invalidate(self, keys: Iterable | None = None) -> None:
+        """Drop the given keys, or all keys, from the cache. Pending writes of
+        dropped keys are flushed first.
+        """
+        if keys is None:
+            self.flush()
+            self._cache.clear()
+            return
+        keys = list(keys)
+        dirty = {key: self._cache[key] for key in keys if key in self._dirty}
+        if dirty:
+            _set_many(self.store, dirty)
+            self._dirty.difference_update(dirty)
+        for key in keys:
+            self._cache.pop(key, None)
+
+    def flush(self) -> None:
+        """Write pending values to the store"""
+        if self._dirty:
+            _set_many(self.store, {key: self._cache[key] for key in self._dirty})
+            self._dirty.clear()
+
+    def commit(self) -> None:
+        self.flush()
+        if hasattr(self.store, "commit"):
+            self.store.commit()
+
+    def close(self) -> None:
+        self.flush()
+        if hasattr(self.store, "close"):
+            self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def _set_many(store: MutableMapping, items: dict) -> None:
+    if hasattr(store, "set_many"):
+        store.set_many(items)
+    else:
+        for key, value in items.items():
+            store[key] = value
+
+
+_DELETED = object()
+_MISSING = object()
+
+
+class WriteBehindMapping(MutableMapping):
+    """Buffer writes to another object store and write them from a background
+    thread, so that callers (e.g., `vrs_enref` with an object store) do not
+    wait for each write and commit.
+
+    Writes buffered while the thread is writing are written together by its
+    next `set_many` and `commit`. Reads see buffered writes. At most
+    `max_pending` writes are buffered in addition to those being written;
+    further writes block until the thread has taken the buffer. `flush()`
+    and `commit()` wait until all buffered writes are committed, and
+    `close()` also stops the thread and closes the store. An error in the
+    thread is raised by the next write, `flush()` or `close()`; the writes
+    of the failed batch are discarded.
+
+    A mapping that is not closed is flushed and closed when the interpreter
+    exits, so that buffered writes are not lost; errors are then only
+    reported by `atexit`. Use `with` or `close()` to handle them.
+
+    The store is read from the caller's threads while it is written from the
+    background thread, so it must be thread-safe, e.g. a
+    ConcurrentSqlite3MutableMapping.
+    """
+
+    def __init__(self, store: MutableMapping, max_pending: int = 100_000) -> None:
+        if max_pending < 1:
+            msg = "max_pending must be a positive integer"
+            raise ValueError(msg)
+        self.store = store
+        self.max_pending = max_pending
+        self._pending = {}  # key -> value, or _DELETED
+        self._writing = {}
+        self._cond = threading.Condition()
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="WriteBehindMapping", daemon=True
+        )
+        self._thread.start()
+        # the thread is a daemon, so that a mapping that is not closed does
+        # not block exit; writes still buffered are written before then
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                self._writing, self._pending = self._pending, {}
+                self._cond.notify_all()
+            try:
+                self._write(self._writing)
+            except Exception as e:
+                error = e
+            else:
+                error = None
+            with self._cond:
+                self._writing = {}
+                self._error = self._error or error
+                self._cond.notify_all()
+
+    def _write(self, batch: dict) -> None:
+        values = {key: value for key, value in batch.items() if value is not _DELETED}
+        if values:
+            _set_many(self.store, values)
+        for key, value in batch.items():
+            if value is _DELETED:
+                with contextlib.suppress(KeyError):
+                    del self.store[key]
+        if hasattr(self.store, "commit"):
+            self.store.commit()
+
+    def _raise_error(self) -> None:
+        """Raise the last error of the background thread, if any. Call with
+        the lock held.
+        """
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _buffered(self, key: Any) -> Any:
+        """Return the buffered value of `key`, _DELETED, or _MISSING if there
+        is none. Call with the lock held.
+        """
+        if key in self._pending:
+            return self._pending[key]
+        return self._writing.get(key, _MISSING)
+
+    def _put(self, items: Iterable[tuple[Any, Any]]) -> None:
+        with self._cond:
+            if self._closed:
+                msg = "WriteBehindMapping is closed"
+                raise ValueError(msg)
+            self._raise_error()
+            for key, value in items:
+                while (
+                    key not in self._pending and len(self._pending) >= self.max_pending
+                ):
+                    self._cond.notify_all()
+                    self._cond.wait()
+                    self._raise_error()
+                self._pending[key] = value
+            self._cond.notify_all()
+
+    def __getitem__(self, key: Any) -> Any:
+        with self._cond:
+            value = self._buffered(key)
+        if value is _DELETED:
+            msg = f"Key not found: {key}"
+            raise KeyError(msg)
+        if value is not _MISSING:
+            return value
+        return self.store[key]
+
+    def get_many(self, keys: Iterable) -> dict:
+        """Return a dict of the `keys` that are found to their values"""
+        found = {}
+        missing = []
+        with self._cond:
+            for key in keys:
+                value = self._buffered(key)
+                if value is _MISSING:
+                    missing.append(key)
+                elif value is not _DELETED:
+                    found[key] = value
+        if hasattr(self.store, "get_many"):
+            found.update(self.store.get_many(missing))
+        else:
+            found.update((key, self.store[key]) for key in missing if key in self.store)
+        return found
+
+    def __contains__(self, key: Any) -> bool:
+        with self._cond:
+            value = self._buffered(key)
+        if value is _MISSING:
+            return key in self.store
+        return value is not _DELETED
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._put([(key, value)])
+
+    def set_many(self, items: Mapping | Iterable[tuple[Any, Any]]) -> None:
+        if isinstance(items, Mapping):
+            items = items.items()
+        self._put(items)
+
+    def __delitem__(self, key: Any) -> None:
+        if key not in self:
+            msg = f"Key not found: {key}"
+            raise KeyError(msg)
+        self._put([(key, _DELETED)])
+
+    def __iter__(self):
+        self.flush()
+        return iter(self.store)
+
+    def __len__(self):
+        self.flush()
+        return len(self.store)
+
+    def flush(self) -> None:
+        """Wait until all buffered writes are committed to the store"""
+        with self._cond:
+            self._cond.notify_all()
+            while self._pending or self._writing:
+                self._cond.wait()
+            self._raise_error()
+
+    def commit(self) -> None:
+        self.flush()
+
+    def close(self) -> None:
+        """Flush, stop the background thread and close the store"""
+        if self._closed:
+            return
+        atexit.unregister(self.close)
+        try:
+            self.flush()
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            self._thread.join()
+            if hasattr(self.store, "close"):
+                self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+_B64URL_VALUES = {
+    c: i
+    for i, c in enumerate(
+        "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    )
+}
+
+
+class _ShardError(NamedTuple):
+    error: Exception
+
+
+_SHARD_DONE = object()
+
+
+class ShardedObjectStore(MutableMapping):
+    """Object store that partitions keys across several stores ("shards").
+
+    GA4GH identifiers (and bare digests) are assigned to shards by the
+    leading characters of their digest; other keys by a hash of the key.
+    Writers working on different shards, e.g. in separate processes, do
+    not contend on one database lock.
+
+    Use `open_sqlite` for a directory of sqlite shards.
+    """
+
+    shard_file_pattern = "shard-{index:04d}-of-{count:04d}.sqlite3"
+
+    def __init__(self, shards: Sequence[MutableMapping]) -> None:
+        if not shards:
+            msg = "At least one shard is required"
+            raise ValueError(msg)
+        self.shards = list(shards)
+
+    @classmethod
+    def open_sqlite(
+        cls, directory: str | Path, n_shards: int = 16, **kwargs
+    ) -> "ShardedObjectStore":
+        """Open (or create) `n_shards` ConcurrentSqlite3MutableMapping shards in
+        `directory`, passing `kwargs` to each.
+
+        :raise ValueError: if `directory` holds shards for a different shard count
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        existing = {p.name for p in directory.glob("shard-*-of-*.sqlite3")}
+        paths = [
+            directory / cls.shard_file_pattern.format(index=i, count=n_shards)
+            for i in range(n_shards)
+        ]
+        if existing and not existing <= {p.name for p in paths}:
+            msg = f"{directory} contains shards for a different shard count than {n_shards}"
+            raise ValueError(msg)
+        return cls(
+            [ConcurrentSqlite3MutableMapping(str(path), **kwargs) for path in paths]
+        )
+
+    def shard_index(self, key: Any) -> int:
+        key = _db_key(key)
+        m = GA4GH_IR_REGEXP.match(key) if isinstance(key, str) else None
+        if m is not None:
+            digest = m["digest"]
+        elif isinstance(key, str) and GA4GH_DIGEST_REGEXP.match(key):
+            digest = key
+        else:
+            return zlib.crc32(str(key).encode()) % len(self.shards)
+        # digests are uniformly distributed; 3 base64url characters give 18 bits
+        prefix = (
+            _B64URL_VALUES[digest[0]] << 12
+            | _B64URL_VALUES[digest[1]] << 6
+            | _B64URL_VALUES[digest[2]]
+        )
+        return prefix % len(self.shards)
+
+    def _shard(self, key: Any) -> MutableMapping:
+        return self.shards[self.shard_index(key)]
+
+    def _group_by_shard(self, keys: Iterable) -> dict[int, list]:
+        groups = {}
+        for key in keys:
+            groups.setdefault(self.shard_index(key), []).append(key)
+        return groups
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._shard(key)[key]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._shard(key)[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        del self._shard(key)[key]
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._shard(key)
+
+    def __iter__(self):
+        for shard in self.shards:
+            yield from shard
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+    def set_many(self, items: Mapping | Iterable[tuple[Any, Any]]) -> None:
+        if isinstance(items, Mapping):
+            items = items.items()
+        groups = {}
+        for key, value in items:
+            groups.setdefault(self.shard_index(key), {})[key] = value
+        for index, shard_items in groups.items():
+            _set_many(self.shards[index], shard_items)
+
+    def get_many(self, keys: Iterable) -> dict:
+        found = {}
+        for index, shard_keys in self._group_by_shard(dict.fromkeys(keys)).items():
+            shard = self.shards[index]
+            if hasattr(shard, "get_many"):
+                found.update(shard.get_many(shard_keys))
+            else:
+                found.update({key: shard[key] for key in shard_keys if key in shard})
+        return found
+
+    def parallel_items(
+        self, max_workers: int | None = None, buffer_size: int = 10_000
+    ) -> Iterator[tuple[Any, Any]]:
+        """Yield all (key, value) pairs, reading shards concurrently in
+        threads. Pairs are yielded in no particular order.
+
+        Shards must support reads from multiple threads, as
+        ConcurrentSqlite3MutableMapping does.
+        """
+        items = queue.Queue(maxsize=buffer_size)
+        stop = threading.Event()
+
+        def _put(item):
+            while not stop.is_set():
+                try:
+                    items.put(item, timeout=0.1)
+                except queue.Full:
+                    continue
+                return
+
+        def _read_shard(shard):
+            try:
+                for item in shard.items():
+                    if stop.is_set():
+                        return
+                    _put(item)
+            except Exception as e:
+                _put(_ShardError(e))
+            finally:
+                _put(_SHARD_DONE)
+
+        with ThreadPoolExecutor(max_workers or len(self.shards)) as executor:
+            for shard in self.shards:
+                executor.submit(_read_shard, shard)
+            try:
+                remaining = len(self.shards)
+                while remaining:
+                    item = items.get()
+                    if item is _SHARD_DONE:
+                        remaining -= 1
+                    elif isinstance(item, _ShardError):
+                        raise item.error
+                    else:
+                        yield item
+            finally:
+                stop.set()
+
+    def merge(self, other: Mapping, batch_size: int = 10_000) -> int:
+        """Copy all items of `other` into this store, e.g. the stores written
+        by separate workers, or a store with a different shard count (to
+        reshard). Returns the number of items copied.
+
+        The shards of a ShardedObjectStore with as many shards are copied
+        into the matching shards of this store, without routing each key;
+        the items of other stores are written in batches of `batch_size`,
+        each routed to its shards by `set_many()`.
+        """
+        if (
+            isinstance(other, ShardedObjectStore)
+            and len(other.shards) == len(self.shards)
+            and type(other).shard_index is type(self).shard_index
+        ):
+            return sum(
+                copy_store(source, shard, batch_size)
+                for source, shard in zip(other.shards, self.shards, strict=True)
+            )
+        return copy_store(other, self, batch_size)
+
+    def compact(self, max_workers: int | None = None) -> None:
+        """Compact each shard that supports it, in up to `max_workers`
+        threads (by default, one per shard)
+
+        Shards must support use from other threads, as
+        ConcurrentSqlite3MutableMapping does.
+        """
+        shards = [shard for shard in self.shards if hasattr(shard, "compact")]
+        if not shards:
+            return
+        with ThreadPoolExecutor(max_workers or len(shards)) as executor:
+            for future in [executor.submit(shard.compact) for shard in shards]:
+                future.result()
+
+    def commit(self) -> None:
+        for shard in self.shards:
+            if hasattr(shard, "commit"):
+                shard.commit()
+
+    def close(self) -> None:
+        for shard in self.shards:
+            if hasattr(shard, "close"):
+                shard.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+_LOG_MAGIC = b"VRSLOG1\n"
+_INDEX_MAGIC = b"VRSIDX1\n"
+_CODEC_NAME_SIZE = struct.Struct("<H")
+_RECORD_HEADER = struct.Struct("<II")  # key size, value size
+# magic, slots, used slots, items, indexed data file size
+_INDEX_HEADER = struct.Struct("<8sQQQQ")
+_INDEX_SLOT = struct.Struct("<QQ")  # key hash, record offset + 1 (0: empty)
+_TOMBSTONE = 0xFFFFFFFF
+_DIGEST_KEY_RE = re.compile(rb"^(?:ga4gh:[^.]+\.)?([0-9A-Za-z_\-]{32})$")
+
+
+def _key_hash(key: bytes) -> int:
+    """64-bit hash of `key`: for GA4GH identifiers and digests, the leading
+    bytes of the (uniformly distributed) 24-byte digest
+    """
+    m = _DIGEST_KEY_RE.match(key)
+    if m is not None:
+        return int.from_bytes(base64.urlsafe_b64decode(m[1])[:8], "little")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def _lock_file(f: BinaryIO, path: Path) -> None:
+    """Hold an exclusive lock on the open file `f` until it is closed"""
+    if fcntl is None:
+        return
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        msg = f"{path} is open for writing by another LogObjectStore"
+        raise BlockingIOError(msg) from None
+
+
+def _release(mm: mmap.mmap | None) -> None:
+    """Close `mm` unless views of it are still in use (then it is unmapped
+    when they are released)
+    """
+    if mm is not None:
+        with contextlib.suppress(BufferError):
+            mm.close()
+
+
+class LogObjectStore(MutableMapping):
+    """Append-only object store for large, read-mostly ID→object catalogs.
+
+    Values are encoded with `codec` and appended to the data file at `path`.
+    Overwriting or deleting a key appends a new record; the space of the old
+    one is reclaimed by `compact()`. Keys must be strings.
+
+    The index, in the file `path + ".idx"`, is an open-addressing hash table
+    from the 64-bit hash of each key (for GA4GH identifiers, the leading bytes
+    of the digest) to the offset of its latest record. Both files are
+    memory-mapped, so lookups take O(1) probes and no parsing, and
+    `get_bytes()` returns encoded values without copying. `commit()` and
+    `close()` add the records appended since to the index in place; the
+    index is rebuilt only when it is half full, and by `compact()`. Records
+    appended after the index was last updated are indexed in memory when the
+    store is opened.
+
+    One process at a time may open the store for writing, which holds an
+    exclusive lock on the data file (where `fcntl` is available) and
+    truncates an incomplete record at its end (e.g., after a crash). Any
+    number may open it with `readonly=True`, which never modifies the files.
+    A read-only store also finds the records a writer commits after it was
+    opened; `refresh()` brings the rest of its view (e.g., `len()`, and
+    records not yet committed to the index) up to date.
+
+    Not thread-safe.
+    """
+
+    index_suffix = ".idx"
+
+    def __init__(
+        self,
+        path: str | Path,
+        codec: str | Codec | None = None,
+        readonly: bool = False,
+    ) -> None:
+        """Open or create the store in the data file `path`.
+
+        - codec: value codec spec (see `ga4gh.vrs.extras.object_codecs`),
+                recorded in the data file when it is created. If not given,
+                the recorded codec is used, or `dill` for new stores.
+        - readonly: open an existing store for reading only
+        """
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + self.index_suffix)
+        self.readonly = readonly
+        self._file = self.path.open("rb" if readonly else "a+b")
+        self._data = None
+        self._index = None
+        try:
+            if not readonly:
+                _lock_file(self._file, self.path)
+                if self._file.seek(0, os.SEEK_END) == 0:
+                    name = get_codec(codec or DEFAULT_CODEC).name.encode()
+                    self._file.write(
+                        _LOG_MAGIC + _CODEC_NAME_SIZE.pack(len(name)) + name
+                    )
+                    self._file.flush()
+            self._remap()
+            self.codec = self._read_codec(codec)
+            self._tail = {}  # key -> (record offset, live)
+            self._scanned = self._scan(self._open_index())
+        except BaseException:
+            self._file.close()
+            _release(self._data)
+            _release(self._index)
+            raise
+        self._closed = False
+
+    def _remap(self) -> None:
+        if not self.readonly:
+            self._file.flush()
+        _release(self._data)
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _read_codec(self, codec: str | Codec | None) -> Codec:
+        if self._data[: len(_LOG_MAGIC)] != _LOG_MAGIC:
+            msg = f"Not a LogObjectStore data file: {self.path}"
+            raise ValueError(msg)
+        start = len(_LOG_MAGIC) + _CODEC_NAME_SIZE.size
+        (size,) = _CODEC_NAME_SIZE.unpack_from(self._data, len(_LOG_MAGIC))
+        recorded = self._data[start : start + size].decode()
+        self._data_start = start + size
+        codec = get_codec(codec or recorded)
+        if recorded != codec.name:
+            msg = f"Store is encoded with codec {recorded!r}, not {codec.name!r}"
+            raise ValueError(msg)
+        return codec
+
+    def _open_index(self) -> int:
+        """Map the index, if it is current; return the data file offset up to
+        which records are indexed by it
+        """
+        self._n_slots = 0
+        self._used = 0
+        self._len = 0
+        try:
+            with self.index_path.open("rb") as f:
+                if os.fstat(f.fileno()).st_size < _INDEX_HEADER.size:
+                    return self._data_start
+                index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return self._data_start
+        magic, n_slots, used, n_items, indexed = _INDEX_HEADER.unpack_from(index)
+        if (
+            magic != _INDEX_MAGIC
+            or indexed > len(self._data)
+            or len(index) != _INDEX_HEADER.size + n_slots * _INDEX_SLOT.size
+        ):
+            # foreign, stale or partly updated; the whole data file is indexed
+            # in memory
+            _release(index)
+            return self._data_start
+        self._index = index
+        self._n_slots = n_slots
+        self._used = used
+        self._len = n_items
+        return indexed
+
+    def _scan(self, offset: int) -> int:
+        """Index the records from `offset` to the end of the data file in
+        memory; return the offset after the last complete record
+        """
+        end = len(self._data)
+        while offset + _RECORD_HEADER.size <= end:
+            key_size, value_size = _RECORD_HEADER.unpack_from(self._data, offset)
+            start = offset + _RECORD_HEADER.size
+            size = key_size + (0 if value_size == _TOMBSTONE else value_size)
+            if start + size > end:
+                break
+            key = self._data[start : start + key_size]
+            self._put_tail(key, offset, value_size != _TOMBSTONE)
+            offset = start + size
+        if offset < end and not self.readonly:
+            # left by an interrupted write; no other writer can be appending
+            _release(self._data)
+            self._file.truncate(offset)
+            self._remap()
+        return offset
+
+    def refresh(self) -> None:
+        """Reload the index, and index the records appended since in memory,
+        e.g. after writes by another process
+        """
+        self._remap()
+        _release(self._index)
+        self._index = None
+        self._tail = {}
+        self._scanned = self._scan(self._open_index())
+
+    def _record(self, offset: int) -> tuple[bytes, int, int]:
+        """Return the key, value offset and value size of the record at `offset`"""
+        if offset + _RECORD_HEADER.size > len(self._data):
+            # indexed by a writer after this store was mapped
+            self._remap()
+        key_size, value_size = _RECORD_HEADER.unpack_from(self._data, offset)
+        start = offset + _RECORD_HEADER.size
+        return self._data[start : start + key_size], start + key_size, value_size
+
+    def _probe(self, key: bytes) -> tuple[int, int | None]:
+        """Return the index slot of `key` (or the empty slot for it), and the
+        offset of the record in that slot, if any
+        """
+        key_hash = _key_hash(key)
+        mask = self._n_slots - 1
+        slot = key_hash & mask
+        while True:
+            slot_hash, offset = _INDEX_SLOT.unpack_from(
+                self._index, _INDEX_HEADER.size + slot * _INDEX_SLOT.size
+            )
+            if offset == 0:
+                return slot, None
+            if slot_hash == key_hash and self._record(offset - 1)[0] == key:
+                return slot, offset - 1
+            slot = (slot + 1) & mask
+
+    def _index_lookup(self, key: bytes) -> int | None:
+        """Return the offset of the indexed record of `key`, or None if it is
+        not indexed or deleted
+        """
+        if self._index is None:
+            return None
+        offset = self._probe(key)[1]
+        if offset is None or self._record(offset)[2] == _TOMBSTONE:
+            return None
+        return offset
+
+    def _index_offsets(self) -> list[int]:
+        """Return the record offsets in the index, in data file order"""
+        if self._index is None:
+            return []
+        return sorted(
+            offset - 1
+            for _, offset in _INDEX_SLOT.iter_unpack(
+                memoryview(self._index)[_INDEX_HEADER.size :]
+            )
+            if offset
+        )
+
+    def _locate(self, key: bytes) -> int | None:
+        """Return the offset of the record of `key`, or None if not found"""
+        entry = self._tail.get(key)
+        if entry is not None:
+            offset, live = entry
+            return offset if live else None
+        return self._index_lookup(key)
+
+    def _put_tail(self, key: bytes, offset: int, live: bool) -> None:
+        found = self._locate(key) is not None
+        self._tail[key] = (offset, live)
+        self._len += live - found
+
+    def _iter_live(self) -> Iterator[tuple[bytes, int]]:
+        """Yield the key and record offset of all items"""
+        tail = dict(self._tail)
+        for key, (offset, live) in tail.items():
+            if live:
+                yield key, offset
+        for offset in self._index_offsets():
+            key, _, value_size = self._record(offset)
+            if value_size != _TOMBSTONE and key not in tail:
+                yield key, offset
+
+    @staticmethod
+    def _key_bytes(key: Any) -> bytes:
+        key = _db_key(key)
+        if not isinstance(key, str):
+            msg = f"LogObjectStore keys must be strings, not {type(key).__name__}"
+            raise TypeError(msg)
+        return key.encode()
+
+    def _check_writable(self) -> None:
+        if self.readonly:
+            msg = f"LogObjectStore is open read-only: {self.path}"
+            raise io.UnsupportedOperation(msg)
+
+    def _append(self, records: Iterable[tuple[bytes, bytes | None]]) -> None:
+        """Append records, with value None for deletions, in one write"""
+        self._check_writable()
+        records = list(records)
+        offset = self._file.seek(0, os.SEEK_END)
+        buf = bytearray()
+        for key, value in records:
+            self._put_tail(key, offset + len(buf), value is not None)
+            if value is None:
+                buf += _RECORD_HEADER.pack(len(key), _TOMBSTONE) + key
+            else:
+                buf += _RECORD_HEADER.pack(len(key), len(value)) + key + value
+        self._file.write(buf)
+        self._scanned = offset + len(buf)
+
+    def _value_view(self, offset: int) -> memoryview:
+        if offset >= len(self._data):
+            self._remap()
+        _, start, size = self._record(offset)
+        return memoryview(self._data)[start : start + size]
+
+    def get_bytes(self, key: Any) -> memoryview:
+        """Return the encoded value of `key` as a read-only view of the
+        memory-mapped data file, without copying it
+        """
+        offset = self._locate(self._key_bytes(key))
+        if offset is None:
+            msg = f"Key not found: {key}"
+            raise KeyError(msg)
+        return self._value_view(offset)
+
+    def __getitem__(self, key: Any) -> Any:
+        with self.get_bytes(key) as view:
+            return self.codec.decode(view.tobytes())
+
+    def get_many(self, keys: Iterable) -> dict:
+        """Return a dict of the `keys` that are found to their values"""
+        found = {}
+        for key in keys:
+            offset = self._locate(self._key_bytes(key))
+            if offset is not None:
+                with self._value_view(offset) as view:
+                    found[key] = self.codec.decode(view.tobytes())
+        return found
+
+    def __contains__(self, key: Any) -> bool:
+        return self._locate(self._key_bytes(key)) is not None
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.set_many({key: value})
+
+    def set_many(self, items: Mapping | Iterable[tuple[Any, Any]]) -> None:
+        if isinstance(items, Mapping):
+            items = items.items()
+        self._append(
+            (self._key_bytes(key), self.codec.encode(value)) for key, value in items
+        )
+
+    def __delitem__(self, key: Any) -> None:
+        if key not in self:
+            msg = f"Key not found: {key}"
+            raise KeyError(msg)
+        self._append([(self._key_bytes(key), None)])
+
+    def __iter__(self):
+        for key, _ in self._iter_live():
+            yield key.decode()
+
+    def __len__(self):
+        return self._len
+
+    def _write_index(self, entries: list[tuple[bytes, int]]) -> None:
+        """Replace the index with one of `entries`, covering the whole data
+        file, with room for as many entries again to be added in place
+        """
+        n_slots = 8
+        while n_slots < 4 * len(entries):
+            n_slots *= 2
+        mask = n_slots - 1
+        table = bytearray(_INDEX_HEADER.size + n_slots * _INDEX_SLOT.size)
+        _INDEX_HEADER.pack_into(
+            table,
+            0,
+            _INDEX_MAGIC,
+            n_slots,
+            len(entries),
+            len(entries),
+            len(self._data),
+        )
+        used = bytearray(n_slots)
+        for key, offset in entries:
+            key_hash = _key_hash(key)
+            slot = key_hash & mask
+            while used[slot]:
+                slot = (slot + 1) & mask
+            used[slot] = 1
+            _INDEX_SLOT.pack_into(
+                table,
+                _INDEX_HEADER.size + slot * _INDEX_SLOT.size,
+                key_hash,
+                offset + 1,
+            )
+        tmp_path = self.index_path.with_name(self.index_path.name + ".tmp")
+        with tmp_path.open("wb") as f:
+            f.write(table)
+            f.flush()
+            os.fsync(f.fileno())
+        _release(self._index)
+        tmp_path.replace(self.index_path)
+        self._tail = {}
+        self._scanned = self._scan(self._open_index())
+
+    def _update_index(self) -> None:
+        """Add the records appended since the index was written to it, in
+        place, or rebuild it if that would fill more than half of its slots
+        """
+        self._remap()
+        if self._index is None or 2 * (self._used + len(self._tail)) > self._n_slots:
+            self._write_index(list(self._iter_live()))
+            return
+        with self.index_path.open("r+b") as f:
+            index = mmap.mmap(f.fileno(), 0)
+        try:
+            # marked stale while its slots change, so that it is ignored if
+            # the update is interrupted
+            index[: len(_INDEX_MAGIC)] = bytes(len(_INDEX_MAGIC))
+            index.flush()
+            for key, (offset, live) in self._tail.items():
+                slot, indexed = self._probe(key)
+                if indexed is None:
+                    if not live:
+                        continue
+                    self._used += 1
+                _INDEX_SLOT.pack_into(
+                    index,
+                    _INDEX_HEADER.size + slot * _INDEX_SLOT.size,
+                    _key_hash(key),
+                    offset + 1,
+                )
+            _INDEX_HEADER.pack_into(
+                index,
+                0,
+                _INDEX_MAGIC,
+                self._n_slots,
+                self._used,
+                self._len,
+                len(self._data),
+            )
+            index.flush()
+        finally:
+            index.close()
+        self._tail = {}
+
+    def commit(self) -> None:
+        """Write appended records through to disk, and add them to the index"""
+        if self.readonly:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        if self._tail:
+            self._update_index()
+
+    def compact(self) -> None:
+        """Rewrite the data file with only the current records, and the index.
+
+        Offline: no other process may use the store meanwhile.
+        """
+        self._check_writable()
+        self._remap()
+        entries = []
+        tmp_path = self.path.with_name(self.path.name + ".compact")
+        with tmp_path.open("wb") as f:
+            f.write(self._data[: self._data_start])
+            for key, offset in sorted(self._iter_live(), key=lambda e: e[1]):
+                _, start, size = self._record(offset)
+                entries.append((key, f.tell()))
+                f.write(self._data[offset : start + size])
+            f.flush()
+            os.fsync(f.fileno())
+        # locked before it replaces the data file, so that the lock is held
+        # throughout
+        new_file = tmp_path.open("a+b")
+        try:
+            _lock_file(new_file, self.path)
+        except BaseException:
+            new_file.close()
+            raise
+        # without an index, an interrupted compaction is recovered by a scan
+        self.index_path.unlink(missing_ok=True)
+        _release(self._index)
+        self._index = None
+        tmp_path.replace(self.path)
+        _release(self._data)
+        self._data = None
+        self._file.close()
+        self._file = new_file
+        self._remap()
+        self._write_index(entries)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        if self._tail:
+            self.commit()
+        self._file.close()
+        _release(self._data)
+        _release(self._index)
+        self._closed = True
+
+    def __del__(self) -> None:
+        if hasattr(self, "_closed"):
+            self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+
+def copy_store(
+    source: Mapping, target: MutableMapping, batch_size: int = 10_000
+) -> int:
+    """Copy all items of `source` into `target` in batches, e.g. to merge
+    stores or to reshard. Returns the number of items copied.
+    """
+    if hasattr(source, "parallel_items"):
+        items = source.parallel_items()
+    else:
+        items = source.items()
+    n = 0
+    batch = {}
+    for key, value in items:
+        batch[key] = value
+        if len(batch) >= batch_size:
+            _set_many(target, batch)
+            n += len(batch)
+            batch = {}
+    if batch:
+        _set_many(target, batch)
+        n += len(batch)
+    return n
+
+
+class AsyncObjectStore(Protocol):
+    """Interface of object stores used from asyncio code, e.g. by
+    `ga4gh.vrs.vrs_enref_async` and `ga4gh.vrs.vrs_deref_async`
+    """
+
+    async def aget(self, key: Any) -> Any:
+        """Return the value for `key`; raise KeyError if not found"""
+
+    async def aset(self, key: Any, value: Any) -> None:
+        """Set the value for `key`"""
+
+    async def aget_many(self, keys: Iterable) -> Mapping:
+        """Return a mapping of the `keys` that are found to their values"""
+
+    async def aset_many(self, items: Mapping | Iterable[tuple[Any, Any]]) -> None:
+        """Set the values of all `items`"""
+
+
+def _resolve(
+    futures: Iterable[asyncio.Future],
+    result: Any = None,
+    error: BaseException | None = None,
+) -> None:
+    for fut in futures:
+        if fut.done():  # e.g., cancelled by the caller
+            continue
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            fut.set_result(result)
+
+
+class AsyncSqlite3ObjectStore:
+    """Sqlite3MutableMapping for use from asyncio code (an `AsyncObjectStore`).
+
+    The store is opened and used on a dedicated thread, so sqlite never blocks
+    the event loop. Requests issued in the same event loop iteration, or while
+    the thread is busy, are batched: pending writes are written with one
+    `set_many`, then pending reads are answered by one `get_many`. A read
+    issued after an awaited write sees that write.
+
+    Use from one event loop at a time. The synchronous store is available as
+    `store`, but must only be used from the store thread (see `run`).
+    """
+
+    def __init__(self, sqlite3_db: str | Path, **kwargs: Any) -> None:
+        """Open the sqlite3 database file at path `sqlite3_db`. `kwargs` are
+        passed to `Sqlite3MutableMapping`.
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="AsyncSqlite3ObjectStore"
+        )
+        try:
+            self.store = self._executor.submit(
+                Sqlite3MutableMapping, str(sqlite3_db), **kwargs
+            ).result()
+        except BaseException:
+            self._executor.shutdown()
+            raise
+        self._gets: dict[Any, list[asyncio.Future]] = {}
+        self._sets = {}
+        self._set_waiters: list[asyncio.Future] = []
+        self._flush_task: asyncio.Task | None = None
+        self._closed = False
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """Run `func(*args)` on the store thread, e.g. `run(len, store.store)`"""
+        self._check_open()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def _check_open(self) -> None:
+        if self._closed:
+            msg = "AsyncSqlite3ObjectStore is closed"
+            raise ValueError(msg)
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush())
+
+    def _request_get(self, key: Any) -> asyncio.Future:
+        self._check_open()
+        fut = asyncio.get_running_loop().create_future()
+        self._gets.setdefault(key, []).append(fut)
+        self._schedule_flush()
+        return fut
+
+    async def aget(self, key: Any) -> Any:
+        value = await self._request_get(key)
+        if value is _MISSING:
+            msg = f"Key not found: {key}"
+            raise KeyError(msg)
+        return value
+
+    async def aget_many(self, keys: Iterable) -> dict:
+        futures = {key: self._request_get(key) for key in keys}
+        values = await asyncio.gather(*futures.values())
+        return {
+            key: value
+            for key, value in zip(futures, values, strict=True)
+            if value is not _MISSING
+        }
+
+    async def aset(self, key: Any, value: Any) -> None:
+        await self.aset_many({key: value})
+
+    async def aset_many(self, items: Mapping | Iterable[tuple[Any, Any]]) -> None:
+        self._check_open()
+        items = dict(items)
+        if not items:
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._sets.update(items)
+        self._set_waiters.append(fut)
+        self._schedule_flush()
+        await fut
+
+    def _get_many(self, keys: list) -> dict:
+        # decodes on the store thread
+        return dict(self.store.get_many(keys))
+
+    async def _flush(self) -> None:
+        """Serve pending requests in batches until there are none left"""
+        loop = asyncio.get_running_loop()
+        while self._gets or self._sets:
+            gets, self._gets = self._gets, {}
+            sets, self._sets = self._sets, {}
+            set_waiters, self._set_waiters = self._set_waiters, []
+            if sets:
+                try:
+                    await loop.run_in_executor(
+                        self._executor, self.store.set_many, sets
+                    )
+                except Exception as e:
+                    _resolve(set_waiters, error=e)
+                else:
+                    _resolve(set_waiters)
+            if gets:
+                try:
+                    found = await loop.run_in_executor(
+                        self._executor, self._get_many, list(gets)
+                    )
+                except Exception as e:
+                    for futures in gets.values():
+                        _resolve(futures, error=e)
+                else:
+                    for key, futures in gets.items():
+                        _resolve(futures, found.get(key, _MISSING))
+
+    async def acommit(self) -> None:
+        """Wait for pending writes and commit them (for `autocommit=False`)"""
+        if self._flush_task is not None:
+            await self._flush_task
+        await self.run(self.store.commit)
+
+    async def aclose(self) -> None:
+        """Serve pending requests, then commit and close the store"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._flush_task is not None:
+            await self._flush_task
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.store.close)
+        self._executor.shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
@@ -1,6 +1,51 @@
+import asyncio
+import gc
+import importlib.util
+import io
+import pickle
+import sqlite3
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+import dill
 import pytest
 
-from ga4gh.vrs.extras.object_store import Sqlite3MutableMapping
+from ga4gh.core import Digest
+from ga4gh.vrs import (
+    models,
+    vrs_deref_async,
+    vrs_deref_many,
+    vrs_enref,
+    vrs_enref_async,
+)
+from ga4gh.vrs.extras.object_codecs import get_codec
+from ga4gh.vrs.extras.object_store import (
+    TUNED_PRAGMAS,
+    AsyncSqlite3ObjectStore,
+    CachedMapping,
+    ConcurrentSqlite3MutableMapping,
+    LogObjectStore,
+    ShardedObjectStore,
+    Sqlite3MutableMapping,
+    WriteBehindMapping,
+    copy_store,
+)
+
+allele_refget_accession = "SQ.F-LrLMe1SRpfUZHkQmvkVKFEGaoDeHul"
+allele = models.Allele(
+    location=models.SequenceLocation(
+        sequenceReference=models.SequenceReference(
+            refgetAccession=allele_refget_accession
+        ),
+        start=55181319,
+        end=55181320,
+    ),
+    state=models.LiteralSequenceExpression(sequence="T"),
+)
 
 
 def test_simple(tmp_path):
@@ -93,6 +138,645 @@ def test_classes(tmp_path):
     object_store.close()
 
 
+def test_set_many(tmp_path):
+    db_path = str(tmp_path) + "/test_set_many.sqlite3"
+    object_store = Sqlite3MutableMapping(db_path, pragmas=TUNED_PRAGMAS)
+    assert object_store.db.execute("pragma journal_mode").fetchone()[0] == "wal"
+
+    value_count = int(1e4)
+    object_store.set_many({f"key{i}": f"value{i}" for i in range(value_count)})
+    object_store.update([("key0", "new-value0")], key1="new-value1")
+    object_store.update({"key2": "new-value2"})
+    assert len(object_store) == value_count
+    object_store.close()
+
+    object_store = Sqlite3MutableMapping(db_path)
+    assert object_store["key0"] == "new-value0"
+    assert object_store["key1"] == "new-value1"
+    assert object_store["key2"] == "new-value2"
+    for i in range(3, value_count):
+        assert object_store[f"key{i}"] == f"value{i}"
+    object_store.close()
+
+    with pytest.raises(ValueError, match="Invalid PRAGMA"):
+        Sqlite3MutableMapping(db_path, pragmas={"journal_mode": "wal; drop table x"})
+
+
+def test_row_count(tmp_path):
+    db_path = str(tmp_path) + "/test_row_count.sqlite3"
+
+    def count(object_store):
+        return object_store.db.execute("select count(*) from mapping").fetchone()[0]
+
+    # kept without triggers, whatever the connection's settings
+    db = sqlite3.connect(db_path)
+    object_store = Sqlite3MutableMapping(db)
+    assert db.execute("pragma recursive_triggers").fetchone()[0] == 0
+    object_store.set_many({f"key{i}": i for i in range(10)})
+    object_store.set_many({f"key{i}": -i for i in range(5, 15)})
+    object_store["key0"] = 0
+    del object_store["key1"]
+    assert len(object_store) == count(object_store) == 14
+    assert not db.execute(
+        "select name from sqlite_master where type = 'trigger'"
+        " and name like 'mapping_count%'"
+    ).fetchall()
+    object_store.close()
+
+
+@pytest.mark.parametrize(
+    "codec",
+    [
+        "dill",
+        "vrs-json",
+        "pydantic-json",
+        "binary",
+        "binary+zlib",
+        pytest.param(
+            "pydantic-json+zstd",
+            marks=pytest.mark.skipif(
+                importlib.util.find_spec("zstandard") is None,
+                reason="zstandard is not installed",
+            ),
+        ),
+    ],
+)
+def test_codecs(tmp_path, codec):
+    db_path = str(tmp_path) + "/test_codecs.sqlite3"
+    plain_dicts = [
+        {"type": "Allele"},
+        {"type": "SequenceLocation", "start": 1},
+        {"__vrs__": "Allele", "value": {"type": "Allele"}},
+    ]
+    object_store = {}
+    allele_enreffed = vrs_enref(allele, object_store=object_store)
+
+    with Sqlite3MutableMapping(db_path, codec=codec) as sqlite_store:
+        sqlite_store.update(object_store)
+        sqlite_store["plain"] = {"key": ["value", 1]}
+        # plain dicts are not mistaken for VRS objects
+        for i, value in enumerate(plain_dicts):
+            sqlite_store[f"plain{i}"] = value
+
+    # codec is read from the store
+    with Sqlite3MutableMapping(db_path) as sqlite_store:
+        assert sqlite_store.codec.name == codec
+        stored_allele = sqlite_store[allele_enreffed.id]
+        assert isinstance(stored_allele, models.Allele)
+        assert stored_allele.model_dump(exclude_none=True) == (
+            models.Allele(**allele_enreffed.model_dump()).model_dump(exclude_none=True)
+        )
+        stored_location = sqlite_store[allele_enreffed.location]
+        assert stored_location == object_store[allele_enreffed.location]
+        assert sqlite_store["plain"] == {"key": ["value", 1]}
+        for i, value in enumerate(plain_dicts):
+            assert sqlite_store[f"plain{i}"] == value
+
+    with pytest.raises(ValueError, match="Store is encoded with codec"):
+        Sqlite3MutableMapping(db_path, codec="dill" if codec != "dill" else "binary")
+
+
+def test_zstd_codec_threads():
+    pytest.importorskip("zstandard")
+    codec = get_codec("binary+zstd")
+    values = [{"key": [i] * 100} for i in range(200)]
+
+    # each thread compresses with its own zstd contexts
+    with ThreadPoolExecutor(8) as executor:
+        encoded = list(executor.map(codec.encode, values))
+        assert list(executor.map(codec.decode, encoded)) == values
+
+
+def test_codec_errors():
+    with pytest.raises(ValueError, match="Unknown codec"):
+        get_codec("xml")
+    with pytest.raises(ValueError, match="Unknown compression"):
+        get_codec("binary+lz4")
+
+    # the binary codec only decodes builtin types
+    with pytest.raises(pickle.UnpicklingError):
+        get_codec("binary").decode(pickle.dumps(object()))
+
+
+def test_get_many(tmp_path):
+    db_path = str(tmp_path) + "/test_get_many.sqlite3"
+    object_store = Sqlite3MutableMapping(db_path)
+    object_store.max_query_keys = 7
+    object_store.set_many((f"key{i}", f"value{i}") for i in range(100))
+
+    keys = [f"key{i}" for i in range(0, 120, 3)]
+    values = object_store.get_many(keys)
+    assert set(values) == {f"key{i}" for i in range(0, 100, 3)}
+    assert "key99" in values
+    assert "key102" not in values
+    assert values._decoded == {}
+    assert values["key99"] == "value99"
+    assert dict(values) == {f"key{i}": f"value{i}" for i in range(0, 100, 3)}
+
+    assert object_store.contains_many(keys + keys) == set(values)
+    assert object_store.get_many([]) == {}
+    assert object_store.contains_many([]) == set()
+
+    # deref prefetches through get_many
+    allele_enreffed = vrs_enref(allele, object_store=object_store)
+    (allele_dereffed,) = vrs_deref_many([allele_enreffed], object_store=object_store)
+    assert allele_dereffed.location.start == allele.location.start
+    object_store.close()
+
+
+def test_digest_keys(tmp_path):
+    allele_id = vrs_enref(allele, return_id_obj_tuple=True)[0]
+    digest = Digest.from_curie(allele_id)
+    for object_store in (
+        Sqlite3MutableMapping(str(tmp_path / "test_digest_keys.sqlite3")),
+        LogObjectStore(tmp_path / "test_digest_keys.vrslog"),
+        ShardedObjectStore.open_sqlite(tmp_path / "shards", n_shards=4),
+    ):
+        with object_store:
+            object_store[digest] = allele
+            assert list(object_store) == [allele_id]
+            assert object_store[allele_id] == allele
+            assert object_store.get_many([digest]) == {digest: allele}
+            del object_store[digest]
+            assert allele_id not in object_store
+
+
+def test_cached_mapping(tmp_path):
+    db_path = str(tmp_path) + "/test_cached_mapping.sqlite3"
+    sqlite_store = Sqlite3MutableMapping(db_path)
+    sqlite_store.set_many((f"key{i}", f"value{i}") for i in range(10))
+
+    object_store = CachedMapping(sqlite_store, maxsize=3)
+    assert object_store["key0"] == "value0"
+    assert object_store["key0"] == "value0"
+    assert object_store.get_many(["key0", "key1", "key2", "missing"]) == {
+        f"key{i}": f"value{i}" for i in range(3)
+    }
+    assert object_store["key3"] == "value3"
+    assert object_store.cache_info() == (2, 5, 1, 3, 3)
+    with pytest.raises(KeyError):
+        object_store["missing"]
+
+    # write-through
+    object_store["key0"] = "new-value0"
+    assert sqlite_store["key0"] == "new-value0"
+
+    # explicit invalidation after an out-of-band write
+    sqlite_store["key3"] = "new-value3"
+    assert object_store["key3"] == "value3"
+    object_store.invalidate(["key3"])
+    assert object_store["key3"] == "new-value3"
+    object_store.invalidate()
+    assert object_store.cache_info().currsize == 0
+
+    del object_store["key3"]
+    assert "key3" not in object_store
+    assert "key3" not in sqlite_store
+
+
+def test_cached_mapping_write_back():
+    store = {}
+    object_store = CachedMapping(store, maxsize=2, write_back=True)
+    object_store["A"] = 1
+    object_store.set_many({"B": 2})
+    assert store == {}
+    assert object_store["A"] == 1
+
+    # evicting a pending value writes it
+    object_store["C"] = 3
+    assert store == {"B": 2}
+
+    del object_store["C"]
+    object_store.flush()
+    assert store == {"A": 1, "B": 2}
+
+    object_store["D"] = 4
+    object_store.invalidate(["D"])
+    assert store["D"] == 4
+    object_store["E"] = 5
+    assert len(object_store) == 4
+    assert store["E"] == 5
+
+
+def test_write_behind():
+    class SlowStore(dict):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+            self.entered = threading.Event()
+            self.proceed = threading.Event()
+
+        def set_many(self, items):
+            self.entered.set()
+            self.proceed.wait()
+            self.batches.append(len(items))
+            self.update(items)
+
+        def commit(self):
+            if "fail" in self:
+                msg = "commit failed"
+                raise RuntimeError(msg)
+
+    store = SlowStore()
+    object_store = WriteBehindMapping(store, max_pending=4)
+    object_store["key0"] = "value0"
+    # the first write is being written; the next ones are buffered until then
+    store.entered.wait()
+    for i in range(1, 5):
+        object_store[f"key{i}"] = f"value{i}"
+    assert object_store["key4"] == "value4"
+    assert object_store.get_many(["key0", "key1", "missing"]) == {
+        "key0": "value0",
+        "key1": "value1",
+    }
+    del object_store["key2"]
+    assert "key2" not in object_store
+    assert not store
+
+    # the buffer is full, so the next write waits for the thread
+    blocked = threading.Thread(target=object_store.__setitem__, args=("key5", "v5"))
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()
+    store.proceed.set()
+    blocked.join()
+    object_store.flush()
+    # key2 was deleted before it was written
+    assert store.batches == [1, 3, 1]
+    assert "key2" not in store
+    assert len(object_store) == 5
+
+    object_store["fail"] = True
+    with pytest.raises(RuntimeError, match="commit failed"):
+        object_store.flush()
+    object_store.close()
+    with pytest.raises(ValueError, match="closed"):
+        object_store["key0"] = "value0"
+
+
+def test_write_behind_exit(tmp_path):
+    db_path = str(tmp_path / "test_write_behind_exit.sqlite3")
+    # buffered writes of a mapping that is not closed are written at exit
+    script = f"""if True:
+        from ga4gh.vrs.extras.object_store import (
+            ConcurrentSqlite3MutableMapping,
+            WriteBehindMapping,
+        )
+
+        object_store = WriteBehindMapping(ConcurrentSqlite3MutableMapping({db_path!r}))
+        for i in range(1000):
+            object_store[f"key{{i}}"] = i
+    """
+    subprocess.run([sys.executable, "-c", script], check=True)  # noqa: S603
+    with Sqlite3MutableMapping(db_path) as object_store:
+        assert len(object_store) == 1000
+
+
+def test_sharded(tmp_path):
+    object_store = ShardedObjectStore.open_sqlite(tmp_path / "shards", n_shards=4)
+    allele_id, allele_enreffed = vrs_enref(
+        allele, object_store=object_store, return_id_obj_tuple=True
+    )
+    assert object_store[allele_id] == allele_enreffed
+    assert allele_enreffed.location in object_store
+
+    kvp = {f"key{i}": i for i in range(200)}
+    object_store.set_many(kvp)
+    assert len(object_store) == 202
+    assert all(len(shard) > 0 for shard in object_store.shards)
+    assert object_store.shard_index(allele_id) == object_store.shard_index(
+        allele_id.split(".")[1]
+    )
+    assert object_store.get_many(["key1", "key2", "missing"]) == {
+        "key1": 1,
+        "key2": 2,
+    }
+
+    items = dict(object_store.parallel_items(max_workers=2, buffer_size=10))
+    assert len(items) == 202
+    assert items["key199"] == 199
+
+    # stopping early does not block
+    assert len(list(islice(object_store.parallel_items(buffer_size=1), 5))) == 5
+
+    del object_store["key0"]
+    object_store.compact()
+    merged = Sqlite3MutableMapping(str(tmp_path / "merged.sqlite3"))
+    assert copy_store(object_store, merged, batch_size=50) == 201
+    assert merged[allele_id] == allele_enreffed
+
+    # stores with as many shards are merged shard by shard
+    other = ShardedObjectStore.open_sqlite(tmp_path / "other", n_shards=4)
+    other.set_many({f"other{i}": i for i in range(100)})
+    assert object_store.merge(other) == 100
+    assert len(object_store) == 301
+    other.close()
+    # and others are routed by key, e.g. to reshard
+    resharded = ShardedObjectStore([{}, {}, {}])
+    assert resharded.merge(object_store, batch_size=50) == 301
+    assert resharded[allele_id] == allele_enreffed
+    assert all(
+        resharded.shard_index(key) == i
+        for i, shard in enumerate(resharded.shards)
+        for key in shard
+    )
+    object_store.close()
+
+    with pytest.raises(ValueError, match="different shard count"):
+        ShardedObjectStore.open_sqlite(tmp_path / "shards", n_shards=8)
+    with ShardedObjectStore.open_sqlite(tmp_path / "shards", n_shards=4) as reopened:
+        assert reopened["key199"] == 199
+
+
+def test_find(tmp_path):
+    other_refget_accession = "SQ.KEO-4XBcm1cxeo_DIQ8_ofqGUkp4iZhI"
+    db_path = str(tmp_path) + "/test_find.sqlite3"
+    object_store = Sqlite3MutableMapping(db_path)
+
+    def make_location(start, end, refget_accession=allele_refget_accession):
+        return models.SequenceLocation(
+            sequenceReference=models.SequenceReference(
+                refgetAccession=refget_accession
+            ),
+            start=start,
+            end=end,
+        )
+
+    alleles = {
+        start: vrs_enref(
+            models.Allele(
+                location=make_location(start, start + 1),
+                state=models.LiteralSequenceExpression(sequence="T"),
+            ),
+            object_store=object_store,
+        )
+        for start in (55181000, 55181319, 55182000, 55190000)
+    }
+    other_allele = vrs_enref(
+        models.Allele(
+            location=make_location(55181319, 55181320, other_refget_accession),
+            state=models.LiteralSequenceExpression(sequence="T"),
+        ),
+        object_store=object_store,
+    )
+    cnv = vrs_enref(
+        models.CopyNumberChange(
+            location=make_location(
+                models.Range([None, 55180000]), models.Range([55181500, None])
+            ),
+            copyChange="gain",
+        ),
+        object_store=object_store,
+    )
+    object_store["plain"] = {"type": "Allele"}
+
+    # locations written earlier are not read back to index their objects
+    statements = []
+    object_store.db.set_trace_callback(statements.append)
+    allele_copy = models.Allele(**alleles[55182000].model_dump())
+    object_store[allele_copy.id] = allele_copy
+    object_store.db.set_trace_callback(None)
+    assert not [s for s in statements if s.startswith("select")]
+
+    overlapping = dict(
+        object_store.find(
+            type="Allele",
+            refget_accession="ga4gh:" + allele_refget_accession,
+            start=55181000,
+            end=55182000,
+        )
+    )
+    assert set(overlapping) == {alleles[55181000].id, alleles[55181319].id}
+    assert overlapping[alleles[55181319].id] == alleles[55181319]
+
+    assert [k for k, _ in object_store.find(type="CopyNumberChange")] == [cnv.id]
+    assert {
+        k
+        for k, _ in object_store.find(
+            refget_accession=allele_refget_accession, start=55181400, end=55181401
+        )
+    } == {cnv.id, cnv.location}
+    assert {
+        k for k, _ in object_store.find(refget_accession=other_refget_accession)
+    } == {
+        other_allele.id,
+        other_allele.location,
+    }
+    with pytest.raises(ValueError, match="refget_accession is required"):
+        next(object_store.find(start=1))
+
+    def find_keys(start, end, refget_accession=allele_refget_accession):
+        return {
+            k
+            for k, _ in object_store.find(
+                refget_accession=refget_accession, start=start, end=end
+            )
+        }
+
+    # open-ended Ranges are unbounded
+    object_store.set_many(
+        {
+            "open_start": make_location(models.Range([None, 100]), 200),
+            "open_end": make_location(300, models.Range([400, None])),
+        }
+    )
+    cnv_keys = {cnv.id, cnv.location}
+    assert find_keys(10, 20) == {"open_start", *cnv_keys}
+    assert "open_end" in find_keys(10**9, 10**9 + 1)
+
+    # empty intervals overlap at their bounds, unlike adjacent residues
+    object_store.set_many(
+        {
+            "insertion": make_location(250, 250),
+            "before": make_location(240, 250),
+            "after": make_location(260, 270),
+        }
+    )
+    assert find_keys(250, 260) == {"insertion", *cnv_keys}
+    assert find_keys(240, 250) == {"insertion", "before", *cnv_keys}
+    assert find_keys(250, 250) == {"insertion", "before", *cnv_keys}
+    assert find_keys(260, None) >= {"after"}
+    assert "insertion" not in find_keys(260, None)
+
+    # the interval index is searched by sequence
+    statements = []
+    object_store.db.set_trace_callback(statements.append)
+    find_keys(250, 260)
+    object_store.db.set_trace_callback(None)
+    plan = " ".join(
+        row[-1]
+        for statement in statements
+        if statement.startswith("select m.key")
+        for row in object_store.db.execute("explain query plan " + statement)
+    )
+    # R*Tree constraints: A0, equal on the sequence dimension
+    assert "VIRTUAL TABLE INDEX 2:A0" in plan
+    assert find_keys(55181319, 55181320, other_refget_accession) == {
+        other_allele.id,
+        other_allele.location,
+    }
+    assert find_keys(0, 10**9, "SQ.unknown") == set()
+
+    # replaced and deleted values are removed from the interval index
+    object_store[alleles[55181000].id] = {"type": "Allele"}
+    del object_store[alleles[55181319].id]
+    assert (
+        list(
+            object_store.find(
+                type="Allele",
+                refget_accession=allele_refget_accession,
+                start=55181000,
+                end=55182000,
+            )
+        )
+        == []
+    )
+    object_store.close()
+
+
+def test_find_upgraded_store(tmp_path):
+    db_path = str(tmp_path) + "/test_find_upgraded_store.sqlite3"
+    db = sqlite3.connect(db_path)
+    db.execute("create table mapping (key text, value blob)")
+    db.execute(
+        "insert into mapping values (?, ?)",
+        (allele_refget_accession, dill.dumps(allele.location)),
+    )
+    db.commit()
+    db.close()
+
+    # existing stores are opened as is, e.g. read-only
+    ro_db = sqlite3.connect(f"{Path(db_path).as_uri()}?mode=ro", uri=True)
+    object_store = Sqlite3MutableMapping(ro_db)
+    assert len(object_store) == 1
+    assert object_store[allele_refget_accession] == allele.location
+    with pytest.raises(ValueError, match="upgrade"):
+        next(object_store.find(type="SequenceLocation"))
+    object_store.close()
+
+    # values are indexed in batches, including those whose location is
+    # stored in a later batch
+    object_store = Sqlite3MutableMapping(db_path)
+    object_store["plain"] = 1
+    enrefed = {}
+    allele_id = vrs_enref(allele.model_copy(deep=True), object_store=enrefed).id
+    location_id = enrefed[allele_id].location
+    object_store[allele_id] = enrefed[allele_id]
+    object_store[location_id] = enrefed[location_id]
+    object_store.fetch_size = 1
+    object_store.upgrade()
+    assert list(object_store.find(type="SequenceLocation")) == [
+        (allele_refget_accession, allele.location),
+        (location_id, enrefed[location_id]),
+    ]
+    assert [
+        k
+        for k, _ in object_store.find(
+            type="Allele",
+            refget_accession=allele_refget_accession,
+            start=55181319,
+            end=55181320,
+        )
+    ] == [allele_id]
+    assert len(object_store) == 4
+    object_store.close()
+    object_store = Sqlite3MutableMapping(db_path)
+    assert object_store.codec.name == "dill"
+    assert len(list(object_store.find(type="SequenceLocation"))) == 2
+    object_store.close()
+
+
+def test_items_and_paging(tmp_path):
+    db_path = str(tmp_path) + "/test_items_and_paging.sqlite3"
+    object_store = Sqlite3MutableMapping(db_path)
+    object_store.fetch_size = 7
+    kvp = {f"key{i:03d}": i for i in range(100)}
+    object_store.set_many(kvp)
+    object_store["key000"] = 0
+    del object_store["key099"]
+    del kvp["key099"]
+
+    statements = []
+    object_store.db.set_trace_callback(statements.append)
+    assert len(object_store) == 99
+    assert dict(object_store.items()) == kvp
+    assert sorted(object_store.values()) == sorted(kvp.values())
+    assert not [s for s in statements if "where key" in s], "no per-key lookups"
+    assert len(statements) <= 5
+    object_store.db.set_trace_callback(None)
+
+    pages = []
+    after = None
+    while True:
+        items, after = object_store.page(limit=10, after=after)
+        pages.append(items)
+        if after is None:
+            break
+    assert len(pages) == 10
+    assert [k for page in pages for k, _ in page] == sorted(kvp)
+    assert pages[0][0] == ("key000", 0)
+    object_store.close()
+
+    # the count is maintained across connections
+    object_store = Sqlite3MutableMapping(db_path)
+    assert len(object_store) == 99
+    object_store.close()
+
+
+def test_concurrent(tmp_path):
+    db_path = str(tmp_path) + "/test_concurrent.sqlite3"
+    value_count = 1000
+    object_store = ConcurrentSqlite3MutableMapping(db_path, codec="binary")
+    object_store.set_many((f"key{i}", f"value{i}") for i in range(value_count))
+    assert object_store.db.execute("pragma journal_mode").fetchone()[0] == "wal"
+
+    reader_dbs = set()
+
+    def read_all(offset):
+        reader_dbs.add(threading.get_ident())
+        for i in range(value_count):
+            j = (i + offset) % value_count
+            assert object_store[f"key{j}"] == f"value{j}"
+        return len(object_store)
+
+    def write_more():
+        for i in range(value_count, 2 * value_count):
+            object_store[f"key{i}"] = f"value{i}"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        writer = executor.submit(write_more)
+        lengths = list(executor.map(read_all, range(0, value_count, 100)))
+        writer.result()
+
+    assert all(value_count <= n <= 2 * value_count for n in lengths)
+    assert len(reader_dbs) > 1
+    # reader connections are closed when their threads exit
+    gc.collect()
+    assert len(object_store._readers) == 0
+    assert len(object_store) == 2 * value_count
+    object_store.close()
+
+    # uncommitted writes can be read back
+    object_store = ConcurrentSqlite3MutableMapping(db_path, autocommit=False)
+    object_store["new"] = "value"
+    assert object_store["new"] == "value"
+    assert "new" in object_store
+    del object_store["new"]
+    assert "new" not in object_store
+    object_store["new"] = "value"
+    object_store.commit()
+    thread = threading.Thread(target=read_all, args=(0,))
+    thread.start()
+    thread.join()
+    assert object_store["new"] == "value"
+    assert len(object_store._readers) == 1
+    object_store.close()
+    assert len(object_store._readers) == 0
+
+    with pytest.raises(ValueError, match="requires a database file path"):
+        ConcurrentSqlite3MutableMapping(":memory:")
+
+
 # This version verifies that setting autocommit=False may
 # lose data is .close or .commit is not explicitly called
 # def test_no_commit():
@@ -109,6 +793,155 @@ def test_classes(tmp_path):
 #         assert object_store[f"key{i}"] == f"value{i}"
 
 
+def test_async(tmp_path):
+    db_path = tmp_path / "test_async.sqlite3"
+
+    async def run():
+        async with AsyncSqlite3ObjectStore(db_path) as object_store:
+            calls = []
+            set_many = object_store.store.set_many
+            get_many = object_store.store.get_many
+            object_store.store.set_many = lambda items: (
+                calls.append(("set_many", len(items))),
+                set_many(items),
+            )
+            object_store.store.get_many = lambda keys: (
+                calls.append(("get_many", len(keys))) or get_many(keys)
+            )
+
+            # concurrently issued requests are batched
+            await asyncio.gather(
+                *(object_store.aset(f"key{i}", f"value{i}") for i in range(10))
+            )
+            assert calls == [("set_many", 10)]
+            calls.clear()
+            values = await asyncio.gather(
+                object_store.aget("key0"),
+                object_store.aget("key0"),
+                object_store.aget_many(["key1", "key2", "missing"]),
+            )
+            assert values == ["value0", "value0", {"key1": "value1", "key2": "value2"}]
+            assert calls == [("get_many", 4)]
+            with pytest.raises(KeyError):
+                await object_store.aget("missing")
+
+            # read-your-writes
+            await object_store.aset_many({"key0": "new-value0"})
+            assert await object_store.aget("key0") == "new-value0"
+
+            allele_id, _ = await vrs_enref_async(
+                allele, object_store, return_id_obj_tuple=True
+            )
+            assert await object_store.run(len, object_store.store) == 12
+            allele_ref = await object_store.aget(allele_id)
+            allele_deref = await vrs_deref_async(allele_ref, object_store)
+            assert allele_deref.location.id == allele_ref.location
+            assert allele_deref.location.start == allele.location.start
+        with pytest.raises(ValueError, match="closed"):
+            await object_store.aget("key0")
+
+    asyncio.run(run())
+    assert Sqlite3MutableMapping(str(db_path))["key0"] == "new-value0"
+
+
+def test_log_store(tmp_path):
+    path = tmp_path / "test_log_store.vrslog"
+    with LogObjectStore(path, codec="pydantic-json") as object_store:
+        allele_id, _ = vrs_enref(allele, object_store, return_id_obj_tuple=True)
+        object_store.set_many((f"key{i}", f"value{i}") for i in range(10))
+        assert len(object_store) == 12
+        assert object_store["key0"] == "value0"
+        assert object_store.get_many(["key1", "missing"]) == {"key1": "value1"}
+    assert path.with_name(path.name + ".idx").exists()
+
+    # served from the index
+    object_store = LogObjectStore(path)
+    assert object_store.codec.name == "pydantic-json"
+    assert len(object_store) == 12
+    assert object_store[allele_id].id == allele_id
+    assert bytes(object_store.get_bytes("key0")) == b'"value0"'
+    assert "missing" not in object_store
+    with pytest.raises(KeyError):
+        object_store["missing"]
+
+    # overwrites and deletes, appended after the index
+    object_store["key0"] = "new-value0"
+    del object_store["key1"]
+    with pytest.raises(KeyError):
+        del object_store["key1"]
+    assert object_store["key0"] == "new-value0"
+    assert "key1" not in object_store
+    assert len(object_store) == 11
+    keys = set(object_store)
+    assert len(keys) == 11
+    assert "key1" not in keys
+    object_store.commit()
+    size = path.stat().st_size
+    assert object_store._tail == {}
+
+    # only one writer at a time, but any number of readers, which find the
+    # records the writer commits
+    with pytest.raises(BlockingIOError, match="open for writing"):
+        LogObjectStore(path)
+    reader = LogObjectStore(path, readonly=True)
+    assert reader["key0"] == "new-value0"
+    assert "key1" not in reader
+    object_store["key20"] = "value20"
+    object_store.commit()
+    assert reader["key20"] == "value20"
+    reader.refresh()
+    assert len(reader) == 12
+    with pytest.raises(io.UnsupportedOperation):
+        reader["key21"] = "value21"
+
+    # an incomplete record at the end, e.g. a write in progress, is left to
+    # readers, and truncated by the next writer
+    index_size = object_store.index_path.stat().st_size
+    del object_store["key20"]
+    object_store.close()
+    # updated in place
+    assert object_store.index_path.stat().st_size == index_size
+    size = path.stat().st_size
+    with path.open("ab") as f:
+        f.write(b"\x04\x00\x00\x00")
+    reopened = LogObjectStore(path, readonly=True)
+    assert reopened["key0"] == "new-value0"
+    assert set(reopened) == keys
+    reopened.close()
+    reader.refresh()
+    assert "key20" not in reader
+    assert path.stat().st_size == size + 4
+    reopened = LogObjectStore(path)
+    assert path.stat().st_size == size
+    assert len(reopened) == 11
+    assert set(reopened) == keys
+    reopened.close()
+    reader.close()
+
+    with LogObjectStore(path) as object_store:
+        object_store.compact()
+        assert path.stat().st_size < size
+        assert len(object_store) == 11
+        assert object_store["key0"] == "new-value0"
+        assert object_store["key2"] == "value2"
+
+    # the index grows as needed
+    with LogObjectStore(path) as object_store:
+        for i in range(5):
+            object_store.set_many((f"batch{i}-{j}", j) for j in range(50))
+            object_store.commit()
+    with LogObjectStore(path, readonly=True) as object_store:
+        assert object_store._tail == {}
+        assert len(object_store) == 261
+        assert object_store["batch4-49"] == 49
+        assert object_store["key2"] == "value2"
+
+    with pytest.raises(ValueError, match="codec 'pydantic-json'"):
+        LogObjectStore(path, codec="dill")
+    with pytest.raises(TypeError):
+        LogObjectStore(path)[1] = "value"
+
+
 def test_commit(tmp_path):
     db_path = str(tmp_path) + "/test_commit.sqlite3"
     object_store = Sqlite3MutableMapping(db_path, autocommit=False)
@@ -1,9 +1,92 @@
+import asyncio
+import json
 import os
 import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
 
 import pytest
+import requests
 
-from ga4gh.vrs.dataproxy import create_dataproxy
+from ga4gh.core import sha512t24u
+from ga4gh.vrs.dataproxy import (
+    AsyncSeqRepoRESTDataProxy,
+    CachingDataProxy,
+    DataProxyValidationError,
+    FastaDataProxy,
+    SeqRepoDataProxy,
+    SeqRepoRESTDataProxy,
+    SequenceProxy,
+    create_dataproxy,
+)
+
+
+@pytest.fixture
+def seqrepo_rest_server(dataproxy):
+    """Serve the local SeqRepo like seqrepo-rest-service, on a free local port
+
+    Set `server.failures` to have that many requests fail with 503 first, and
+    `server.delay` to delay responses by that many seconds.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):  # noqa: N802
+            url = urlsplit(self.path)
+            server.paths.append(self.path)
+            server.client_ports.add(self.client_address[1])
+            with server.lock:
+                server.active += 1
+                server.max_active = max(server.max_active, server.active)
+            time.sleep(server.delay)
+            with server.lock:
+                server.active -= 1
+            kind, _, identifier = url.path.removeprefix("/seqrepo/1/").partition("/")
+            params = {k: int(v[0]) for k, v in parse_qs(url.query).items()}
+            status, body = 200, b""
+            try:
+                if server.failures > 0:
+                    server.failures -= 1
+                    status = 503
+                elif kind == "ping":
+                    body = b"{}"
+                elif kind == "sequence":
+                    body = dataproxy.get_sequence(identifier, **params).encode()
+                elif kind == "metadata":
+                    md = dataproxy.get_metadata(identifier)
+                    body = json.dumps(md, default=str).encode()
+                else:
+                    status = 404
+            except KeyError:
+                status = 404
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.failures = 0
+    server.delay = 0
+    server.lock = threading.Lock()
+    server.active = server.max_active = 0
+    server.paths = []
+    server.client_ports = set()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/seqrepo"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
 
 
 @pytest.mark.parametrize("dp", ["rest_dataproxy", "dataproxy"])
@@ -65,3 +148,518 @@ def test_data_proxy_configs():
         ),
     ):
         create_dataproxy("file:///path/to/seqrepo/root")
+
+
+def test_data_proxy_caches(dataproxy):
+    dp = SeqRepoDataProxy(
+        dataproxy.sr,
+        metadata_cache_size=1,
+        sequence_cache_bytes=100,
+        sequence_block_size=0,
+    )
+    ac = "ga4gh:SQ.v_QTc1p-MUYdgrRv4LMT6ByXIOsdw3C_"
+    assert dp.get_sequence(ac, 0, 60) == dp.get_sequence(ac, 0, 60)
+    dp.get_sequence(ac, 60, 110)
+    assert dp.cache_info()["sequence"] == (1, 2, 1, 100, 50)
+    # sequences larger than the budget are not cached
+    assert len(dp.get_sequence(ac)) == 4560
+    assert dp.cache_info()["sequence"].currsize == 50
+
+    assert dp.derive_refget_accession("NM_000551.3") == ac[len("ga4gh:") :]
+    assert dp.derive_refget_accession("NM_000551.3") == ac[len("ga4gh:") :]
+    info = dp.cache_info()
+    assert info["translate_sequence_identifier"].hits == 1
+    assert info["metadata"].currsize == 1
+
+    # caches are per instance
+    assert SeqRepoDataProxy(dataproxy.sr).cache_info()["sequence"].misses == 0
+
+    dp.clear_caches()
+    assert all(info.currsize == 0 for info in dp.cache_info().values())
+
+
+def test_data_proxy_sequence_blocks(dataproxy):
+    dp = SeqRepoDataProxy(dataproxy.sr, sequence_block_size=100)
+    fetches = []
+
+    def _get_sequence(identifier, start=None, end=None):
+        fetches.append((start, end))
+        return dataproxy._get_sequence(identifier, start, end)
+
+    dp._get_sequence = _get_sequence
+    ac = "ga4gh:SQ.v_QTc1p-MUYdgrRv4LMT6ByXIOsdw3C_"
+    seq = dataproxy.get_sequence(ac)
+    assert dp.get_sequence(ac, 10, 20) == seq[10:20]
+    assert dp.get_sequence(ac, 95, 105) == seq[95:105]
+    assert dp.get_sequence(ac, 0, 300) == seq[0:300]
+    assert dp.get_sequence(ac, 4550, 4600) == seq[4550:]
+    # the last block is not requested past the end of the sequence
+    assert fetches == [(0, 100), (100, 200), (200, 300), (4500, 4560)]
+    assert dp.get_sequence(ac, 150, 4560) == seq[150:]
+    assert dp.get_sequence(ac, 4600, 4610) == ""
+    assert fetches[4:] == [(300, 4500)]
+
+
+@pytest.mark.parametrize("pack_contigs", [False, True])
+def test_data_proxy_preload_contigs(dataproxy, pack_contigs):
+    dp = SeqRepoDataProxy(
+        dataproxy.sr,
+        preload_contigs=True,
+        contig_memory_budget=18000 if pack_contigs else 12000,
+        pack_contigs=pack_contigs,
+    )
+    fetches = []
+
+    def _get_sequence(identifier, start=None, end=None):
+        fetches.append((identifier, start, end))
+        return dataproxy._get_sequence(identifier, start, end)
+
+    dp._get_sequence = _get_sequence
+    seqs = {ac: dataproxy.get_sequence(ac) for ac in ("NM_000551.3", "NM_000314.4")}
+    for ac, seq in seqs.items():
+        for start, end in ((0, 10), (101, 102), (4000, None), (None, None)):
+            assert dp.get_sequence(ac, start, end) == seq[start:end]
+    assert fetches == [("NM_000551.3", None, None), ("NM_000314.4", None, None)]
+
+    # the others are released before loading the next contig, so that the
+    # budget is not exceeded while it is loaded
+    loaded = dp._get_sequence
+
+    def _get_sequence_in_budget(identifier, start=None, end=None):
+        cache_info = dp.cache_info()["contig"]
+        assert cache_info.evictions == 2
+        assert cache_info.currsize == 0
+        return loaded(identifier, start, end)
+
+    dp._get_sequence = _get_sequence_in_budget
+    assert dp.get_sequence("NM_000059.3", 0, 5) == "GTGGC"
+    assert dp.cache_info()["contig"].evictions == 2
+    dp._get_sequence = loaded
+
+    dp.contig_memory_budget = 1000
+    dp.clear_caches()
+    assert dp.get_sequence("NM_000059.3", 0, 5) == "GTGGC"
+    assert fetches[-1] == ("NM_000059.3", 0, 11386)
+
+
+def test_fasta_data_proxy(dataproxy, tmp_path):
+    ac = "NM_000551.3"
+    seq = dataproxy.get_sequence(ac)
+    fasta_path = tmp_path / "test.fa"
+    fai = []
+    with fasta_path.open("w") as f:
+        for name, s in (("nm", seq), ("short", "ACGTN")):
+            f.write(f">{name} description\n")
+            fai.append(f"{name}\t{len(s)}\t{f.tell()}\t60\t61\n")
+            for i in range(0, len(s), 60):
+                f.write(s[i : i + 60].lower() + "\n")
+    (tmp_path / "test.fa.fai").write_text("".join(fai))
+    (tmp_path / "test.fa.aliases.tsv").write_text(f"nm\trefseq:{ac}\tcomment\n")
+
+    dp = create_dataproxy(f"fasta+file://{fasta_path}")
+    assert dp.get_sequence(ac) == seq
+    for start, end in ((0, 10), (55, 125), (4500, 4560), (4500, 5000), (10, 5)):
+        assert dp.get_sequence("nm", start, end) == seq[start:end]
+    assert dp.get_sequence("short", 3) == "TN"
+
+    # ga4gh digests are computed as needed, and can be saved
+    md = dp.get_metadata("refseq:NM_000551.3")
+    assert md["length"] == 4560
+    assert "ga4gh:SQ.v_QTc1p-MUYdgrRv4LMT6ByXIOsdw3C_" in md["aliases"]
+    assert dp.derive_refget_accession(ac) == "SQ.v_QTc1p-MUYdgrRv4LMT6ByXIOsdw3C_"
+    short_ac = "ga4gh:SQ." + sha512t24u(b"ACGTN")
+    assert dp.get_sequence(short_ac) == "ACGTN"
+    dp.save_aliases()
+    assert FastaDataProxy(fasta_path)._aliases == {
+        "nm": [f"refseq:{ac}", "ga4gh:SQ.v_QTc1p-MUYdgrRv4LMT6ByXIOsdw3C_"],
+        "short": [short_ac],
+    }
+
+    with pytest.raises(KeyError):
+        dp.get_sequence("missing")
+
+    # digests are computed for all sequences once, to look any of them up
+    with FastaDataProxy(fasta_path, aliases_path=tmp_path / "none.tsv") as dp:
+        fetches = []
+        get_sequence = dp._get_sequence
+
+        def _get_sequence(identifier, start=None, end=None):
+            fetches.append(identifier)
+            return get_sequence(identifier, start, end)
+
+        dp._get_sequence = _get_sequence
+        assert dp.get_sequence(short_ac) == "ACGTN"
+        assert fetches == [short_ac, "nm", "short"]
+        assert (
+            dp.get_metadata("ga4gh:SQ.v_QTc1p-MUYdgrRv4LMT6ByXIOsdw3C_")["length"]
+            == 4560
+        )
+        missing_ac = "ga4gh:SQ." + sha512t24u(b"missing")
+        with pytest.raises(KeyError):
+            dp.get_sequence(missing_ac)
+        assert fetches == [short_ac, "nm", "short", missing_ac]
+    assert dp._fasta.closed
+
+
+def test_rest_data_proxy_session(seqrepo_rest_server):
+    server = seqrepo_rest_server
+    dp = SeqRepoRESTDataProxy(server.base_url, backoff_factor=0, timeout=5)
+    assert server.paths == ["/seqrepo/1/ping"]
+
+    # connections are reused, and 5xx responses are retried
+    server.failures = 2
+    assert dp.get_sequence("NM_000551.3", 0, 10) == "CCTCGCCTCC"
+    assert dp.get_metadata("NM_000551.3")["length"] == 4560
+    assert len(server.paths) == 5
+    assert len(server.client_ports) == 1
+    assert "start=0&end=10" in server.paths[3]
+
+    with pytest.raises(KeyError):
+        dp.get_sequence("NM_000000.0")
+
+    # and retries are limited
+    server.failures = 4
+    with pytest.raises(requests.HTTPError, match="503"):
+        dp.get_sequence("NM_000551.3", 10, 20)
+    assert len(server.paths) == 10
+    dp.close()
+
+    # blocks, if enabled, are not requested past the end of the sequence
+    dp = SeqRepoRESTDataProxy(
+        server.base_url, disable_healthcheck=True, sequence_block_size=8 * 2**10
+    )
+    assert len(dp.get_sequence("NM_000551.3", 4000, 4010)) == 10
+    assert "start=0&end=4560" in server.paths[-1]
+    assert len(dp.get_sequence("NM_000551.3", 10, 20)) == 10
+    assert len(server.paths) == 12
+    dp.close()
+
+    # windows are off by default, so slices are requested as looked up
+    dp = SeqRepoRESTDataProxy(server.base_url, disable_healthcheck=True)
+    sp = SequenceProxy(dp, "NM_000551.3")
+    assert len(sp[100:110] + sp[110:120]) == 20
+    assert server.paths[-2:] == [
+        "/seqrepo/1/sequence/NM_000551.3?start=100&end=110",
+        "/seqrepo/1/sequence/NM_000551.3?start=110&end=120",
+    ]
+    dp.close()
+
+    with pytest.raises(requests.ConnectionError):
+        SeqRepoRESTDataProxy("http://127.0.0.1:1/seqrepo", retries=1, backoff_factor=0)
+
+
+def test_async_rest_data_proxy(seqrepo_rest_server):
+    server = seqrepo_rest_server
+    server.delay = 0.05
+    ac = "NM_000551.3"
+    regions = [(ac, i, i + 10) for i in range(0, 200, 10)]
+
+    async def main():
+        async with AsyncSeqRepoRESTDataProxy(
+            server.base_url,
+            max_concurrency=4,
+            disable_healthcheck=True,
+            metadata_cache_size=0,
+            sequence_cache_bytes=0,
+        ) as dp:
+            seqs = await dp.get_sequences(regions)
+            assert server.max_active == 4
+
+            # identical lookups in flight share one request
+            del server.paths[:]
+            md, refget_ac, *_ = await asyncio.gather(
+                dp.get_metadata(ac),
+                dp.derive_refget_accession(ac),
+                *(dp.get_metadata(ac) for _ in range(5)),
+            )
+            assert len(server.paths) == 2
+
+            with pytest.raises(KeyError):
+                await dp.get_sequences([(ac, 0, 10), ("NM_000000.0", 0, 10)])
+        return seqs, md, refget_ac
+
+    seqs, md, refget_ac = asyncio.run(main())
+    seq = "".join(seqs)
+    assert seq.startswith("CCTCGCCTCCGTTACAACGGCCTACGGTGCTGGAGGATCCTTCTGCGCAC")
+    assert len(seq) == 200
+    assert md["length"] == 4560
+    assert refget_ac == "SQ.v_QTc1p-MUYdgrRv4LMT6ByXIOsdw3C_"
+
+
+def test_caching_data_proxy(dataproxy, seqrepo_rest_server, tmp_path):
+    inner = SeqRepoDataProxy(
+        dataproxy.sr,
+        metadata_cache_size=0,
+        sequence_cache_bytes=0,
+        sequence_block_size=0,
+    )
+    fetches = []
+
+    def _get_sequence(identifier, start=None, end=None):
+        fetches.append((start, end))
+        return dataproxy._get_sequence(identifier, start, end)
+
+    def _get_metadata(identifier):
+        fetches.append(identifier)
+        return dataproxy._get_metadata(identifier)
+
+    inner._get_sequence = _get_sequence
+    inner._get_metadata = _get_metadata
+    path = tmp_path / "cache.sqlite"
+    ac = "NM_000551.3"
+    seq = dataproxy.get_sequence(ac)
+
+    dp = CachingDataProxy(inner, path, sequence_block_size=100)
+    assert dp.get_sequence(ac, 95, 105) == seq[95:105]
+    assert dp.get_sequence(ac, 4550, 4600) == seq[4550:]
+    assert dp.get_sequence(ac, 10) == seq[10:]
+    assert fetches == [ac, ac, (0, 200), (4500, 4560), (200, 4500)]
+    # whole sequences are stored in blocks too
+    assert dp.get_sequence(ac) == seq
+    assert len(fetches) == 5
+    db = sqlite3.connect(path)
+    assert db.execute(
+        "select count(*), max(length(value)) from cache where key like '[\"block\"%'"
+    ).fetchone() == (46, 100)
+    db.close()
+
+    # results persist, and are shared with other instances and processes
+    dp2 = CachingDataProxy(inner, path, sequence_block_size=100)
+    with ThreadPoolExecutor(4) as executor:
+        results = list(
+            executor.map(
+                lambda p: (p.get_sequence(ac, 0, 300), p.get_metadata(ac)),
+                [dp, dp2] * 4,
+            )
+        )
+    assert all(r == (seq[:300], dataproxy.get_metadata(ac)) for r in results)
+    assert dp2.derive_refget_accession(ac) == "SQ.v_QTc1p-MUYdgrRv4LMT6ByXIOsdw3C_"
+    del fetches[:]
+    dp3 = CachingDataProxy(inner, path, sequence_block_size=100)
+    assert dp3.get_sequence(ac, 0, 300) == seq[:300]
+    assert dp3.get_metadata(ac)["length"] == 4560
+    # and are kept in memory in front of the database
+    assert dp3.get_sequence(ac, 50, 250) == seq[50:250]
+    assert dp3.cache_info()["sequence"].hits == 3
+    assert dp3.derive_refget_accession(ac) == "SQ.v_QTc1p-MUYdgrRv4LMT6ByXIOsdw3C_"
+    assert fetches == []
+    dp3.close()
+    dp.close()
+    dp2.close()
+
+    # least recently used entries are evicted beyond the size limit
+    refget_ac = "ga4gh:SQ.v_QTc1p-MUYdgrRv4LMT6ByXIOsdw3C_"
+    block_bytes = len(json.dumps(["block", refget_ac, 100, 10])) + 100
+    evict_path = tmp_path / "evict.sqlite"
+    dp = CachingDataProxy(
+        inner,
+        evict_path,
+        max_bytes=3 * block_bytes + 50,
+        sequence_block_size=100,
+        sequence_cache_bytes=0,
+    )
+    dp.touch_interval = 0
+    del fetches[:]
+    for start in (1000, 1100, 1200, 1000, 1300, 1100):
+        assert dp.get_sequence(ac, start, start + 100) == seq[start : start + 100]
+    assert fetches == [
+        ac,
+        ac,
+        (1000, 1100),
+        (1100, 1200),
+        (1200, 1300),
+        (1300, 1400),
+        (1100, 1200),
+    ]
+    db = sqlite3.connect(evict_path)
+    assert db.execute("select bytes from cache_size").fetchone() == (3 * block_bytes,)
+    keys = [json.loads(key)[3] for (key,) in db.execute("select key from cache")]
+    assert sorted(keys) == [10, 11, 13]
+    db.close()
+    dp.close()
+
+    # without blocks, ranges are cached as is, but whole sequences are not
+    ranges_path = tmp_path / "ranges.sqlite"
+    dp = CachingDataProxy(inner, ranges_path, sequence_block_size=0)
+    assert dp.get_sequence(ac, 10, 20) == seq[10:20]
+    assert dp.get_sequence(ac) == seq
+    db = sqlite3.connect(ranges_path)
+    keys = [json.loads(key) for (key,) in db.execute("select key from cache")]
+    assert [key for key in keys if key[0] == "sequence"] == [
+        ["sequence", refget_ac, 10, 20]
+    ]
+    db.close()
+    dp.close()
+
+    # an owned inner proxy does not cache sequences, and is closed too
+    for owns_inner in (True, False):
+        inner = SeqRepoDataProxy(dataproxy.sr)
+        closed = []
+        inner.close = lambda closed=closed: closed.append(True)
+        dp = CachingDataProxy(
+            inner, tmp_path / f"owns_inner_{owns_inner}.sqlite", owns_inner=owns_inner
+        )
+        assert dp.get_sequence(ac, 0, 10) == seq[:10]
+        assert (inner.cache_info()["sequence"].currsize == 0) == owns_inner
+        assert (inner.sequence_block_size == 0) == owns_inner
+        dp.close()
+        assert closed == ([True] if owns_inner else [])
+
+    server = seqrepo_rest_server
+    uri = f"seqrepo+{server.base_url}?cache={path}&cache_bytes=100000"
+    for _ in range(2):
+        del server.paths[:]
+        dp = create_dataproxy(uri)
+        assert isinstance(dp, CachingDataProxy)
+        assert isinstance(dp.inner, SeqRepoRESTDataProxy)
+        assert dp.inner.base_url == f"{server.base_url}/1/"
+        assert dp.max_bytes == 100000
+        assert dp.get_sequence(ac, 1300, 1400) == seq[1300:1400]
+        dp.close()
+    assert server.paths == ["/seqrepo/1/ping"]
+
+
+@pytest.mark.parametrize("suffix", [".tsv", ".tsv.gz"])
+def test_alias_snapshot(dataproxy, tmp_path, suffix):
+    path = tmp_path / f"aliases{suffix}"
+    refget_ac = "SQ.v_QTc1p-MUYdgrRv4LMT6ByXIOsdw3C_"
+    dataproxy.save_alias_snapshot(
+        path, ["NM_000551.3", f"ga4gh:{refget_ac}", "refseq:NM_000314.4"]
+    )
+
+    dp = SeqRepoDataProxy(dataproxy.sr, alias_snapshot=path)
+    dp.get_metadata = None  # lookups must not need metadata
+    assert dp.derive_refget_accession("NM_000551.3") == refget_ac
+    assert dp.translate_sequence_identifier("refseq:NM_000551.3", "ga4gh") == [
+        f"ga4gh:{refget_ac}"
+    ]
+    assert sorted(dp.translate_sequence_identifier(f"ga4gh:{refget_ac}")) == sorted(
+        dataproxy.get_metadata("NM_000551.3")["aliases"]
+    )
+    assert dp.get_sequence_length("NM_000314.4") == 5572
+    assert len(SequenceProxy(dp, "refseq:NM_000551.3")) == 4560
+    assert dp.cache_info()["translate_sequence_identifier"].misses == 0
+
+    root_dir = Path(dataproxy.sr._root_dir).resolve()
+    dp = create_dataproxy(f"seqrepo+file://{root_dir}?alias_snapshot={path}")
+    assert dp._find_alias_record("NM_000314.4").length == 5572
+
+    with pytest.raises(KeyError):
+        dataproxy.save_alias_snapshot(path, ["NM_000000.0"])
+
+
+def test_sequence_proxy_window(dataproxy):
+    ac = "NM_000059.3"
+    seq = dataproxy.get_sequence(ac)
+    dp = SeqRepoDataProxy(dataproxy.sr, sequence_block_size=0)
+    fetches = []
+
+    def _get_sequence(identifier, start=None, end=None):
+        fetches.append((start, end))
+        return dataproxy._get_sequence(identifier, start, end)
+
+    dp._get_sequence = _get_sequence
+    sp = SequenceProxy(dp, ac)
+    assert len(sp) == 11386
+    assert sp[5000:5002] == seq[5000:5002]
+
+    # rolling residue by residue grows the window geometrically
+    assert "".join(sp[i] for i in range(5000, 7000)) == seq[5000:7000]
+    assert "".join(sp[i] for i in range(5000, 3000, -1)) == seq[3001:5001][::-1]
+    assert fetches == [
+        (5000, 5002),
+        (5002, 5130),
+        (5130, 5260),
+        (5260, 5520),
+        (5520, 6040),
+        (6040, 7080),
+        (2920, 5000),
+    ]
+
+    # near accesses extend the window, and distant ones move it
+    assert sp[100:110] == seq[100:110]
+    assert fetches[-1] == (0, 2920)
+    sp = SequenceProxy(dp, ac)
+    assert sp[100:110] + sp[5000:5010] + sp[105:115] == (
+        seq[100:110] + seq[5000:5010] + seq[105:115]
+    )
+    assert fetches[-3:] == [(100, 110), (5000, 5010), (105, 115)]
+    assert sp[-5:] == seq[-5:]
+    assert sp[11380:11500] == seq[11380:]
+    assert sp[20000] == ""
+    assert str(sp) == seq
+
+    # windows slide once they reach their maximum size, and larger ranges
+    # are not kept
+    dp.sequence_window_max = 1000
+    sp = SequenceProxy(dp, ac)
+    del fetches[:]
+    assert "".join(sp[i] for i in range(5000, 7000)) == seq[5000:7000]
+    assert fetches[-2:] == [(5516, 6032), (6032, 7032)]
+    assert (sp._window_start, len(sp._window)) == (6032, 1000)
+    del fetches[:]
+    assert "".join(sp[i] for i in range(6999, 5499, -1)) == seq[5500:7000][::-1]
+    assert fetches == [(5032, 6032)]
+    assert (sp._window_start, len(sp._window)) == (5032, 1000)
+    assert str(sp) == seq
+    assert len(sp._window) == 1000
+    for start, stop in ((5400, 5600), (6400, 6600), (100, 1100), (90, 95)):
+        assert sp[start:stop] == seq[start:stop]
+        assert len(sp._window) <= 1000
+
+    dp.sequence_window_growth = 0
+    sp = SequenceProxy(dp, ac)
+    del fetches[:]
+    assert sp[10] + sp[11] == seq[10:12]
+    assert fetches == [(10, 11), (11, 12)]
+
+
+def test_get_sequences(dataproxy, seqrepo_rest_server, caplog):
+    dp = SeqRepoDataProxy(dataproxy.sr, sequence_block_size=0)
+    fetches = []
+
+    def _get_sequence(identifier, start=None, end=None):
+        fetches.append((identifier, start, end))
+        return dataproxy._get_sequence(identifier, start, end)
+
+    dp._get_sequence = _get_sequence
+    seqs = {ac: dataproxy.get_sequence(ac) for ac in ("NM_000059.3", "NM_000551.3")}
+    regions = [
+        ("NM_000059.3", 5000, 5010),
+        ("NM_000551.3", 100, 110),
+        ("NM_000059.3", 10, 20),
+        ("NM_000059.3", 15, 30),
+        ("NM_000551.3", 4550, 4600),
+        ("NM_000059.3", 500, 501),
+        ("NM_000551.3", 4555, None),
+    ]
+    expected = [seqs[ac][start:end] for ac, start, end in regions]
+    assert dp.get_sequences(regions) == expected
+    assert fetches == [
+        ("NM_000551.3", 4555, None),
+        ("NM_000059.3", 10, 501),
+        ("NM_000059.3", 5000, 5010),
+        ("NM_000551.3", 100, 110),
+        ("NM_000551.3", 4550, 4600),
+    ]
+    assert dp.get_sequences([]) == []
+
+    refs = [(ac, start, end, seqs[ac][start:end]) for ac, start, end in regions[:3]]
+    assert dp.validate_ref_seqs(refs) == [True, True, True]
+    refs[1] = ("NM_000551.3", 100, 110, "A" * 10)
+    refs[2] = ("NM_000059.3", 10, 20, "")
+    assert dp.validate_ref_seqs(refs, require_validation=False) == [True, False, False]
+    with pytest.raises(DataProxyValidationError, match="NM_000551.3 position 100-110"):
+        dp.validate_ref_seqs(refs)
+    assert "NM_000059.3 position 10-20" in caplog.text
+
+    # REST requests are concurrent
+    server = seqrepo_rest_server
+    server.delay = 0.05
+    rest_dp = SeqRepoRESTDataProxy(server.base_url, pool_size=4)
+    regions = [("NM_000551.3", start, start + 10) for start in range(0, 200, 10)]
+    assert rest_dp.get_sequences(regions) == [
+        seqs["NM_000551.3"][start:end] for _, start, end in regions
+    ]
+    assert server.max_active == 4
+    rest_dp.close()
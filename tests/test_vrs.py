@@ -1,8 +1,12 @@
+import pickle
+
 import pytest
 from pydantic import ValidationError
 
 from ga4gh.core import (
+    Digest,
     VrsObjectIdentifierIs,
+    core_models,
     ga4gh_digest,
     ga4gh_identify,
     ga4gh_serialize,
@@ -12,7 +16,14 @@ from ga4gh.core import (
     sha512t24u,
     use_ga4gh_compute_identifier_when,
 )
-from ga4gh.vrs import models, vrs_deref, vrs_enref
+from ga4gh.core.digests import DIGEST_TYPE_PREFIXES
+from ga4gh.vrs import (
+    models,
+    vrs_deref,
+    vrs_deref_many,
+    vrs_enref,
+    vrs_enref_many,
+)
 
 allele_dict = {
     "location": {
@@ -203,6 +214,50 @@ def test_ga4gh_iri():
     assert ga4gh_serialize(iri) == b'"Hy2XU_-rp4IMh6I_1NXNecBo8Qx8n0oE"'
 
 
+def test_digest():
+    allele_id = ga4gh_identify(a)
+    d = Digest.from_curie(allele_id)
+    assert len(d) == 25
+    assert d.prefix == "VA"
+    assert d.digest == ga4gh_digest(a)
+    assert str(d) == allele_id
+    assert d == Digest.from_digest("VA", ga4gh_digest(a))
+    assert d == Digest.from_blob("VA", ga4gh_serialize(a))
+    assert pickle.loads(pickle.dumps(d)) == d  # noqa: S301
+    assert eval(repr(d)) == d  # noqa: S307
+
+    refget_accession = a.location.sequenceReference.refgetAccession
+    sq = Digest.from_curie(refget_accession)
+    assert sq.curie == f"ga4gh:{refget_accession}"
+    assert Digest.from_curie(sq.curie) == sq
+    assert str(Digest.from_curie(sq.digest)) == sq.digest
+
+    assert {d, Digest.from_curie(allele_id), sq} == {d, sq}
+    assert sorted([d, sq]) == [sq, d]
+    assert Digest("SL", d.raw) != d
+
+    with pytest.raises(ValueError, match="Unknown digest type prefix"):
+        Digest.from_curie("ga4gh:XX." + d.digest)
+    with pytest.raises(ValueError, match="Not a GA4GH CURIE"):
+        Digest.from_curie("other:VA." + d.digest)
+    with pytest.raises(ValueError, match="Invalid sha512t24u digest"):
+        Digest.from_curie("ga4gh:VA.tooshort")
+
+
+def test_digest_type_prefixes():
+    # codes are stored with digests, so every model prefix must have one
+    model_prefixes = {
+        cls.ga4gh.prefix
+        for module in (models, core_models)
+        for cls in vars(module).values()
+        if isinstance(cls, type)
+        and isinstance(getattr(getattr(cls, "ga4gh", None), "prefix", None), str)
+    }
+    assert model_prefixes
+    assert model_prefixes | {"", "SQ"} == set(DIGEST_TYPE_PREFIXES)
+    assert len(set(DIGEST_TYPE_PREFIXES)) == len(DIGEST_TYPE_PREFIXES)
+
+
 def test_enref():
     object_store = {}
     allele_383650.get_or_create_ga4gh_identifier()
@@ -281,6 +336,121 @@ def test_enref2():
     }
 
 
+def test_enref_nested():
+    object_store = {}
+    cpb = models.CisPhasedBlock(**cpb_431012_dict)
+    cpb_id, cpb_enreffed = vrs_enref(
+        cpb, object_store=object_store, return_id_obj_tuple=True
+    )
+    assert cpb_id == "ga4gh:CPB.x8GH5G73cPMs37jy1-9mJjWynu324rxI"
+    assert cpb_enreffed.members == [
+        "ga4gh:VA.SZIS2ua7AL-0YgUTAqyBsFPYK3vE8h_d",
+        "ga4gh:VA.TKhpDsfclpSXpn6BjTLViB_ceqRerOd2",
+    ]
+    assert cpb.id is None, "input is not modified"
+
+    # nested members are stored in their enref'd form
+    stored_allele = object_store["ga4gh:VA.SZIS2ua7AL-0YgUTAqyBsFPYK3vE8h_d"]
+    assert stored_allele.location == "ga4gh:SL.TaoXEhpHvA6SdilBUO-AX00YDARv9Uoe"
+    assert "ga4gh:SL.TaoXEhpHvA6SdilBUO-AX00YDARv9Uoe" in object_store
+    assert cpb_id in object_store
+
+    dereffed = vrs_deref(cpb_enreffed, object_store=object_store)
+    assert dereffed.members[0].model_dump(exclude_none=True) == allele_383650_dict
+    assert (
+        dereffed.members[1].location.model_dump(
+            exclude_none=True, exclude={"id", "digest"}
+        )
+        == allele_417816_dict["location"]
+    )
+
+
+def test_enref_in_place():
+    object_store = {}
+    vo_a = models.Allele(**allele_dict)
+    a_enreffed = vrs_enref(vo_a, object_store=object_store, in_place=True)
+    assert a_enreffed is vo_a
+    assert vo_a.id == ga4gh_identify(models.Allele(**allele_dict))
+    assert vo_a.location == ga4gh_identify(models.Allele(**allele_dict).location)
+
+    a_dereffed = vrs_deref(vo_a, object_store=object_store, in_place=True)
+    assert a_dereffed is vo_a
+    assert vo_a.location.start == 55181319
+
+
+def test_enref_many():
+    class BulkStore(dict):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+
+        def set_many(self, objects):
+            self.batches.append(dict(objects))
+            self.update(objects)
+
+    # the first two alleles are identical and share a location
+    alleles = [
+        models.Allele(**allele_383650_dict),
+        models.Allele(**allele_383650_dict),
+        models.Allele(**allele_417816_dict),
+    ]
+    object_store = BulkStore()
+    enreffed = list(vrs_enref_many(alleles, object_store=object_store, batch_size=2))
+    assert [a.id for a in enreffed] == [vrs_enref(a).id for a in alleles]
+    assert all(isinstance(a.location, str) for a in enreffed)
+
+    assert len(object_store.batches) == 2
+    assert sorted(object_store.batches[0]) == [
+        "ga4gh:SL.TaoXEhpHvA6SdilBUO-AX00YDARv9Uoe",
+        "ga4gh:VA.SZIS2ua7AL-0YgUTAqyBsFPYK3vE8h_d",
+    ]
+    assert len(object_store.batches[1]) == 2
+    assert len(object_store) == 4
+
+    # stores without set_many are written item by item
+    object_store = {}
+    assert len(list(vrs_enref_many(alleles, object_store=object_store))) == 3
+    assert len(object_store) == 4
+
+
+def test_deref_many():
+    class BulkStore(dict):
+        def __init__(self):
+            super().__init__()
+            self.requests = []
+
+        def get_many(self, keys):
+            self.requests.append(set(keys))
+            return {k: self[k] for k in keys if k in self}
+
+    object_store = BulkStore()
+    cpb_enreffed = vrs_enref(cpb_431012, object_store=object_store)
+    allele_enreffed = vrs_enref(allele_383650, object_store=object_store)
+
+    dereffed = vrs_deref_many(
+        [cpb_enreffed, allele_enreffed, cpb_enreffed], object_store=object_store
+    )
+    assert len(dereffed) == 3
+    assert dereffed[1].model_dump(exclude_none=True) == allele_383650_dict
+    assert dereffed[0].members[0] is dereffed[2].members[0]
+    assert dereffed[0].members[0].location is dereffed[1].location
+    assert cpb_enreffed.members[0] == "ga4gh:VA.SZIS2ua7AL-0YgUTAqyBsFPYK3vE8h_d"
+
+    # one bulk fetch per level of references: Alleles, then SequenceLocations
+    assert object_store.requests == [
+        {
+            "ga4gh:VA.SZIS2ua7AL-0YgUTAqyBsFPYK3vE8h_d",
+            "ga4gh:VA.TKhpDsfclpSXpn6BjTLViB_ceqRerOd2",
+            "ga4gh:SL.TaoXEhpHvA6SdilBUO-AX00YDARv9Uoe",
+        },
+        {"ga4gh:SL.KYxoEZ7E-frbN03t8K7e546-LJ-_NrKO"},
+    ]
+
+    del object_store["ga4gh:SL.TaoXEhpHvA6SdilBUO-AX00YDARv9Uoe"]
+    with pytest.raises(KeyError):
+        vrs_deref_many([allele_enreffed], object_store=object_store)
+
+
 def test_class_refatt_map():
     class_refatt_map_expected = {
         "Allele": ["location"],